@@ -1,31 +1,64 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+import math
+from fastapi import APIRouter, HTTPException, Query, Depends
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+from typing import Dict, Any, List, Optional
+from app.database.database import get_db
 from app.ml.trend_analyzer import trend_analyzer
+from app.ml.correlation_engine import correlation_engine
+from app.ml.cross_sectional import cross_sectional_analyzer
 from app.services.news_service import news_service
+from app.services.recent_articles import recent_articles
+from app.services.watchlist_service import watchlist_service
 
 router = APIRouter()
 
+# Upper bound on tickers in one cross-sectional request
+CROSS_SECTION_MAX_TICKERS = 2000
+# Upper bound on tickers x time buckets, which sizes the aggregation matrices
+CROSS_SECTION_MAX_CELLS = 500000
+
+class CrossSectionRequest(BaseModel):
+    tickers: List[str] = []
+    groups: Dict[str, List[str]] = {}
+    user_id: Optional[int] = None
+    lookback_days: int = Field(7, ge=1, le=365)
+    bucket_hours: int = Field(6, ge=1, le=24 * 30)
+    recent_buckets: int = Field(1, ge=1, le=1000)
+    top: int = Field(10, ge=1, le=500)
+
 @router.get("/trends/{ticker}")
-async def get_sentiment_trends(ticker: str) -> Dict[str, Any]:
+async def get_sentiment_trends(
+    ticker: str,
+    advanced: bool = Query(False, description="Include PCA and clustering of the articles")
+) -> Dict[str, Any]:
     """
     Get sentiment trend analysis for a ticker.
     """
     try:
-        # Get news data
+        # Refresh news data, which feeds the recent article store
         news = await news_service.get_news(ticker)
         
-        # Extract sentiment data
-        sentiment_data = [
-            {
-                "score": article["sentiment"]["score"],
-                "label": article["sentiment"]["label"],
-                "datetime": article["datetime"]
-            }
-            for article in news
-        ]
-        
-        # Analyze trends
-        trends = trend_analyzer.analyze_sentiment_trends(sentiment_data)
+        # Analyze trends straight from the columnar store; it only holds
+        # canonical articles, so syndicated near-duplicates are counted once
+        columns = recent_articles.view(ticker)
+        if columns is not None:
+            trends = trend_analyzer.analyze_columns(
+                columns,
+                ticker=ticker.upper(),
+                advanced=advanced,
+                sources=recent_articles.sources.names
+            )
+        else:
+            # The store keeps a bounded number of tickers; fall back to the fetched articles
+            trends = trend_analyzer.analyze_sentiment_trends(
+                [
+                    {"datetime": article['datetime'], "source": article['source'], **article['sentiment']}
+                    for article in news if not article.get('duplicate_of')
+                ],
+                ticker=ticker.upper(),
+                advanced=advanced
+            )
         
         return {
             "status": "success",
@@ -35,4 +68,79 @@ async def get_sentiment_trends(ticker: str) -> Dict[str, Any]:
         raise HTTPException(
             status_code=500,
             detail=f"Error analyzing trends for {ticker}: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.get("/correlation/{ticker}")
+def get_sentiment_price_correlation(
+    ticker: str,
+    interval: str = Query("1h", description="Candle interval, e.g. '15m', '1h' or '1d'"),
+    days: int = Query(30, ge=1, le=730),
+    max_lag: int = Query(24, ge=0, le=240, description="Largest lead/lag in candles"),
+    window: int = Query(24, ge=2, le=1000, description="Rolling correlation window in candles")
+) -> Dict[str, Any]:
+    """
+    Correlate stored news sentiment for a ticker with its price candles.
+    """
+    try:
+        correlation = correlation_engine.analyze_ticker(
+            ticker.upper(), interval=interval, days=days, max_lag=max_lag, window=window
+        )
+        return {
+            "status": "success",
+            "data": correlation
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error correlating sentiment and price for {ticker}: {str(e)}"
+        )
+
+@router.post("/cross-section")
+def get_cross_sectional_sentiment(request: CrossSectionRequest, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """
+    Rank sentiment movers and aggregate sentiment by group across many tickers.
+
+    Groups map a sector or list name to its tickers; when user_id is given the
+    user's watchlist is added as the 'watchlist' group.
+    """
+    groups = {
+        name: [ticker.upper() for ticker in members]
+        for name, members in request.groups.items()
+    }
+    if request.user_id is not None:
+        groups["watchlist"] = [symbol.upper() for symbol in watchlist_service.symbols(db, request.user_id)]
+    tickers = list(dict.fromkeys(
+        [ticker.upper() for ticker in request.tickers] + [t for members in groups.values() for t in members]
+    ))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="At least one ticker or group is required")
+    if len(tickers) > CROSS_SECTION_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {CROSS_SECTION_MAX_TICKERS} tickers are supported")
+    buckets = math.ceil(request.lookback_days * 24 / request.bucket_hours)
+    if len(tickers) * buckets > CROSS_SECTION_MAX_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{len(tickers)} tickers x {buckets} buckets exceeds {CROSS_SECTION_MAX_CELLS} cells; "
+                   "use fewer tickers, a shorter lookback or wider buckets"
+        )
+
+    try:
+        analysis = cross_sectional_analyzer.analyze(
+            tickers,
+            groups=groups,
+            lookback_days=request.lookback_days,
+            bucket_hours=request.bucket_hours,
+            recent_buckets=request.recent_buckets,
+            top=request.top
+        )
+        return {
+            "status": "success",
+            "data": analysis
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error analyzing cross-sectional sentiment: {str(e)}"
+        )
@@ -0,0 +1,112 @@
+import os
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, Any, Optional
+from app.ml.model_registry import model_registry
+from app.ml.sentiment_analyzer import sentiment_analyzer
+from app.ml.shared_weights import process_memory
+from app.config import settings
+
+router = APIRouter()
+
+@router.get("/")
+def list_models() -> Dict[str, Any]:
+    """
+    List registered sentiment model versions with their evaluation metrics.
+    """
+    return {
+        "status": "success",
+        "data": {
+            "serving": sentiment_analyzer.model_version,
+            "active": model_registry.active_version(),
+            "versions": [model_registry.metadata(version) for version in model_registry.versions()]
+        }
+    }
+
+@router.post("/{version}/activate")
+def activate_model(version: str) -> Dict[str, Any]:
+    """
+    Mark a registered version as active and start serving it without a restart.
+
+    The worker handling the request switches immediately; other workers follow
+    within MODEL_SYNC_INTERVAL_SECONDS.
+    """
+    try:
+        model_registry.activate(version)
+        return {
+            "status": "success",
+            "data": {"serving": sentiment_analyzer.load(version)}
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error activating model {version}: {str(e)}"
+        )
+
+@router.post("/reload")
+def reload_model() -> Dict[str, Any]:
+    """
+    Start serving the registry's active version, e.g. after `python -m app.ml.train --activate`.
+
+    Workers also pick up a new active version on their own within
+    MODEL_SYNC_INTERVAL_SECONDS; this makes the handling worker switch now.
+    """
+    try:
+        return {
+            "status": "success",
+            "data": {"serving": sentiment_analyzer.reload()}
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error reloading model: {str(e)}"
+        )
+
+@router.get("/cascade")
+def get_cascade_stats() -> Dict[str, Any]:
+    """
+    Escalation rate and agreement of the fast-classifier cascade.
+    """
+    return {
+        "status": "success",
+        "data": sentiment_analyzer.cascade_stats()
+    }
+
+@router.post("/cascade")
+def configure_cascade(
+    enabled: Optional[bool] = Query(None, description="Turn cascade scoring on or off"),
+    threshold: Optional[float] = Query(None, ge=0.0, le=1.0, description="Fast classifier confidence needed to skip the transformer"),
+    reload: bool = Query(False, description="Reload the fast classifier from disk")
+) -> Dict[str, Any]:
+    """
+    Tune the cascade at runtime without restarting the API.
+
+    The settings are saved to CASCADE_CONFIG_PATH; other workers apply them
+    within MODEL_SYNC_INTERVAL_SECONDS.
+    """
+    try:
+        sentiment_analyzer.configure_cascade(enabled=enabled, threshold=threshold, reload=reload)
+        return {
+            "status": "success",
+            "data": sentiment_analyzer.cascade_stats()
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error configuring cascade: {str(e)}"
+        )
+
+@router.get("/memory")
+def get_worker_memory() -> Dict[str, Any]:
+    """
+    Memory of the worker serving this request, in kB. With shared weights most of the model shows up as shared.
+    """
+    return {
+        "status": "success",
+        "data": {
+            "pid": os.getpid(),
+            "shared_weights": settings.SHARED_WEIGHTS,
+            "memory_kb": process_memory(os.getpid())
+        }
+    }
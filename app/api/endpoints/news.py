@@ -1,10 +1,120 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import AsyncIterator, Dict, Any, List
 
+from app.config import settings
 from app.services.news_service import news_service
+from app.services.news_broadcaster import news_broadcaster, NewsSubscription
 
 router = APIRouter()
 
+# Seconds between keep-alive comments so proxies don't close idle streams
+STREAM_KEEPALIVE_SECONDS = 15
+
+class BulkNewsRequest(BaseModel):
+    tickers: List[str]
+
+@router.post("/bulk", response_model=Dict[str, Any])
+async def fetch_news_bulk(request: BulkNewsRequest) -> Dict[str, Any]:
+    """
+    Fetch news and sentiment for several ticker symbols in one request.
+    
+    Args:
+        request (BulkNewsRequest): Ticker symbols to fetch
+        
+    Returns:
+        Dict[str, Any]: Per-ticker news data with status
+        
+    Raises:
+        HTTPException: If the ticker list is empty or too long
+    """
+    tickers = list(dict.fromkeys(ticker.strip().upper() for ticker in request.tickers if ticker.strip()))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+    if len(tickers) > settings.BULK_NEWS_MAX_TICKERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BULK_NEWS_MAX_TICKERS} tickers can be requested at once"
+        )
+    try:
+        results = await news_service.get_news_bulk(tickers)
+        return {
+            "status": "success",
+            "data": results
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching news for {', '.join(tickers)}: {str(e)}"
+        )
+
+@router.post("/general", response_model=Dict[str, Any])
+async def ingest_general_news(
+    category: str = Query("general", pattern="^(general|forex|crypto|merger)$")
+) -> Dict[str, Any]:
+    """
+    Ingest Finnhub general news and attribute it to every ticker it mentions.
+
+    Args:
+        category (str): Finnhub news category
+
+    Returns:
+        Dict[str, Any]: Number of articles ingested and articles per ticker
+    """
+    try:
+        result = await news_service.ingest_general_news(category)
+        return {
+            "status": "success",
+            "data": result
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error ingesting {category} news: {str(e)}"
+        )
+
+@router.get("/stream")
+async def stream_news(
+    request: Request,
+    tickers: str = Query(..., description="Comma-separated ticker symbols, e.g. 'AAPL,MSFT'")
+) -> StreamingResponse:
+    """
+    Stream newly ingested articles and their sentiment as server-sent events.
+
+    Args:
+        tickers (str): Comma-separated ticker symbols to subscribe to
+
+    Returns:
+        StreamingResponse: A text/event-stream of 'news' events
+
+    Raises:
+        HTTPException: If no ticker symbols are provided
+    """
+    symbols = [symbol.strip() for symbol in tickers.split(",") if symbol.strip()]
+    if not symbols:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+
+    subscription = news_broadcaster.subscribe(symbols)
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _event_stream(request: Request, subscription: NewsSubscription) -> AsyncIterator[str]:
+    """Yield queued events for a subscription until the client disconnects."""
+    try:
+        yield ": subscribed to " + ",".join(sorted(subscription.tickers)) + "\n\n"
+        while not await request.is_disconnected():
+            try:
+                yield await asyncio.wait_for(subscription.queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+    finally:
+        news_broadcaster.unsubscribe(subscription)
+
 @router.get("/{ticker}", response_model=Dict[str, Any])
 async def fetch_news(ticker: str) -> Dict[str, Any]:
     """
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.database.database import SessionLocal
 from app.database.models import User
@@ -24,14 +25,15 @@ class UserLogin(BaseModel):
 
 @router.post("/register")
 def register(user: UserRegister, db: Session = Depends(get_db)):
-    existing = db.query(User).filter((User.username == user.username) | (User.email == user.email)).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Username or email already exists")
     new_user = User(username=user.username, email=user.email)
     # For demo: store password as username + '_pw' in email field (not secure, just for demo)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        # The unique constraints on username and email reject duplicates in the same round trip
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Username or email already exists")
     return {"status": "success", "data": {"id": new_user.id, "username": new_user.username, "email": new_user.email}}
 
 @router.post("/login")
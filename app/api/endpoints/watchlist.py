@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.database.database import SessionLocal
-from app.database.models import Watchlist
 from pydantic import BaseModel
 from typing import List, Optional
-from app.services.stock_service import stock_service
+from app.services.news_service import news_service
+from app.services.watchlist_service import watchlist_service
+from app.ml.sentiment_series import summarize_sentiment
 
 router = APIRouter()
 
@@ -22,47 +24,123 @@ class WatchlistCreate(BaseModel):
     change: float = None
     user_id: int
 
+class WatchlistItem(BaseModel):
+    symbol: str
+    name: Optional[str] = None
+    price: Optional[float] = None
+    change: Optional[float] = None
+
+class WatchlistBatchAdd(BaseModel):
+    user_id: int
+    items: List[WatchlistItem]
+
+class WatchlistBatchRemove(BaseModel):
+    user_id: int
+    symbols: List[str]
+
+def check_batch_size(size: int) -> None:
+    if not size:
+        raise HTTPException(status_code=400, detail="At least one ticker is required")
+    if size > settings.WATCHLIST_MAX_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.WATCHLIST_MAX_BATCH} tickers can be changed at once"
+        )
+
 @router.get("/")
 def get_watchlist(user_id: int = Query(...), db: Session = Depends(get_db)):
-    items = db.query(Watchlist).filter(Watchlist.user_id == user_id).all()
     return {
         "status": "success",
-        "data": [
-            {
-                "symbol": item.symbol,
-                "name": item.name,
-                "price": item.price,
-                "change": item.change,
-            }
-            for item in items
-        ]
+        "data": watchlist_service.get(db, user_id)
+    }
+
+@router.get("/sentiment")
+async def get_watchlist_sentiment(user_id: int = Query(...), db: Session = Depends(get_db)):
+    symbols = watchlist_service.symbols(db, user_id)
+    if len(symbols) > settings.BULK_NEWS_MAX_TICKERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Watchlist sentiment is limited to {settings.BULK_NEWS_MAX_TICKERS} tickers"
+        )
+    try:
+        results = await news_service.get_news_bulk(symbols)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing watchlist sentiment: {str(e)}")
+
+    tickers = {}
+    analyzed = []
+    for symbol in symbols:
+        result = results[symbol]
+        if result["status"] != "success":
+            tickers[symbol] = {"status": "error", "detail": result["detail"]}
+            continue
+        tickers[symbol] = {"status": "success", **summarize_sentiment(result["data"])}
+        analyzed.extend(result["data"])
+
+    return {
+        "status": "success",
+        "data": {
+            "overall": summarize_sentiment(analyzed),
+            "tickers": tickers,
+        }
     }
 
 @router.post("/")
-async def add_to_watchlist(watch: WatchlistCreate, db: Session = Depends(get_db)):
-    # Check if already exists for this user
-    existing = db.query(Watchlist).filter_by(symbol=watch.symbol, user_id=watch.user_id).first()
-    if existing:
+def add_to_watchlist(watch: WatchlistCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    try:
+        added = watchlist_service.add(db, watch.user_id, [watch.model_dump()])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error adding ticker to watchlist: {str(e)}")
+    if not added:
         raise HTTPException(status_code=400, detail="Ticker already in watchlist for this user")
-    
-    # Get current stock info
+
+    # The quote is fetched after the response is sent
+    background_tasks.add_task(watchlist_service.refresh_quotes, watch.user_id, added)
+    return {"status": "success", "data": {
+        "symbol": added[0],
+        "name": watch.name,
+        "price": watch.price,
+        "change": watch.change,
+    }}
+
+@router.post("/batch")
+def add_many_to_watchlist(request: WatchlistBatchAdd, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """Add several tickers at once; tickers already on the watchlist are reported as skipped."""
+    check_batch_size(len(request.items))
     try:
-        stock_info = await stock_service.get_stock_info(watch.symbol)
-        item = Watchlist(
-            symbol=watch.symbol,
-            name=watch.name,
-            price=stock_info["price"],
-            change=stock_info["priceChange"],
-            user_id=watch.user_id
-        )
-        db.add(item)
-        db.commit()
-        db.refresh(item)
-        return {"status": "success", "data": {
-            "symbol": item.symbol,
-            "name": item.name,
-            "price": item.price,
-            "change": item.change,
-        }}
+        added = watchlist_service.add(db, request.user_id, [item.model_dump() for item in request.items])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error adding tickers to watchlist: {str(e)}")
+
+    if added:
+        background_tasks.add_task(watchlist_service.refresh_quotes, request.user_id, added)
+    requested = list(dict.fromkeys(item.symbol.strip().upper() for item in request.items))
+    return {"status": "success", "data": {
+        "added": added,
+        "skipped": [symbol for symbol in requested if symbol not in added],
+    }}
+
+@router.post("/batch/remove")
+def remove_many_from_watchlist(request: WatchlistBatchRemove, db: Session = Depends(get_db)):
+    """Remove several tickers at once; tickers not on the watchlist are reported as missing."""
+    check_batch_size(len(request.symbols))
+    try:
+        removed = watchlist_service.remove(db, request.user_id, request.symbols)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error removing tickers from watchlist: {str(e)}")
+
+    requested = list(dict.fromkeys(symbol.strip().upper() for symbol in request.symbols))
+    return {"status": "success", "data": {
+        "removed": removed,
+        "missing": [symbol for symbol in requested if symbol not in removed],
+    }}
+
+@router.delete("/{symbol}")
+def remove_from_watchlist(symbol: str, user_id: int = Query(...), db: Session = Depends(get_db)):
+    try:
+        removed = watchlist_service.remove(db, user_id, [symbol])
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error adding ticker to watchlist: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error removing ticker from watchlist: {str(e)}")
+    if not removed:
+        raise HTTPException(status_code=404, detail="Ticker not in watchlist for this user")
+    return {"status": "success", "data": {"symbol": removed[0]}}
\ No newline at end of file
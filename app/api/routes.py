@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import news, stocks, analysis, watchlist, users
+from .endpoints import news, stocks, analysis, watchlist, users, models
 
 # Create main router
 router = APIRouter()
@@ -56,4 +56,15 @@ router.include_router(
         200: {"description": "Success"},
         500: {"description": "Internal server error"}
     }
+)
+
+# Add models router
+router.include_router(
+    models.router,
+    prefix="/models",
+    tags=["models"],
+    responses={
+        200: {"description": "Success"},
+        500: {"description": "Internal server error"}
+    }
 )
\ No newline at end of file
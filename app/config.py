@@ -11,9 +11,42 @@ class Settings(BaseSettings):
     
     # API Keys
     FINNHUB_API_KEY: str = os.getenv("FINNHUB_API_KEY", "")
+    FINNHUB_API_URL: str = os.getenv("FINNHUB_API_URL", "https://api.finnhub.io/api/v1")
+    FINNHUB_CALLS_PER_MINUTE: int = int(os.getenv("FINNHUB_CALLS_PER_MINUTE", "60"))
+    
+    # News settings
+    NEWS_CACHE_TTL_SECONDS: int = int(os.getenv("NEWS_CACHE_TTL_SECONDS", "300"))
+    BULK_NEWS_MAX_TICKERS: int = int(os.getenv("BULK_NEWS_MAX_TICKERS", "50"))
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+    NEAR_DUPLICATE_INDEX_SIZE: int = int(os.getenv("NEAR_DUPLICATE_INDEX_SIZE", "50000"))
+    TICKER_DICTIONARY_PATH: str = os.getenv("TICKER_DICTIONARY_PATH", "app/ml/data/ticker_dictionary.json")
+    RECENT_ARTICLES_CAPACITY: int = int(os.getenv("RECENT_ARTICLES_CAPACITY", "2048"))
+    RECENT_ARTICLES_MAX_TICKERS: int = int(os.getenv("RECENT_ARTICLES_MAX_TICKERS", "1000"))
+    
+    # Market data settings
+    CANDLE_CACHE_DIR: str = os.getenv("CANDLE_CACHE_DIR", "app/ml/data/candles")
+    
+    # Watchlist settings: per-process read cache, invalidated on write; the TTL bounds staleness across workers
+    WATCHLIST_CACHE_SIZE: int = int(os.getenv("WATCHLIST_CACHE_SIZE", "10000"))
+    WATCHLIST_CACHE_TTL_SECONDS: int = int(os.getenv("WATCHLIST_CACHE_TTL_SECONDS", "60"))
+    WATCHLIST_MAX_BATCH: int = int(os.getenv("WATCHLIST_MAX_BATCH", "100"))
     
     # Model settings
-    MODEL_PATH: str = "app/ml/models/sentiment_model.pkl"
+    MODEL_REGISTRY_DIR: str = os.getenv("MODEL_REGISTRY_DIR", "app/ml/models")
+    SENTIMENT_MODEL_NAME: str = os.getenv("SENTIMENT_MODEL_NAME", "finiteautomata/bertweet-base-sentiment-analysis")
+    # How often each worker checks the registry for a newly activated version
+    MODEL_SYNC_INTERVAL_SECONDS: float = float(os.getenv("MODEL_SYNC_INTERVAL_SECONDS", "5"))
+    # Map weights from a safetensors file so Uvicorn workers share one copy (CPU only)
+    SHARED_WEIGHTS: bool = os.getenv("SHARED_WEIGHTS", "false").lower() == "true"
+    SHARED_WEIGHTS_DIR: str = os.getenv("SHARED_WEIGHTS_DIR", "app/ml/models/shared")
+    
+    # Cascade settings: a fast classifier scores first, low-confidence items go to the transformer
+    CASCADE_ENABLED: bool = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+    CASCADE_THRESHOLD: float = float(os.getenv("CASCADE_THRESHOLD", "0.9"))
+    CASCADE_AUDIT_RATE: float = float(os.getenv("CASCADE_AUDIT_RATE", "0.02"))
+    FAST_CLASSIFIER_PATH: str = os.getenv("FAST_CLASSIFIER_PATH", "app/ml/models/fast_classifier.joblib")
+    # Runtime cascade changes are saved here so every worker applies them
+    CASCADE_CONFIG_PATH: str = os.getenv("CASCADE_CONFIG_PATH", "app/ml/models/cascade.json")
     
     class Config:
         env_file = ".env"
@@ -6,7 +6,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from app.database.database import engine
 from app.database.models import Base
+from app.database.migrations import upgrade
 
 # This will create all tables defined in models.py
 Base.metadata.create_all(bind=engine)
+# Add columns and constraints that create_all does not add to existing tables
+upgrade(engine)
 print("Tables created successfully.")
\ No newline at end of file
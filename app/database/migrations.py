@@ -0,0 +1,79 @@
+"""
+In-place upgrades for databases created before a model gained a column or constraint.
+
+Base.metadata.create_all only creates missing tables, so changes to existing
+tables are applied here. Every step inspects the live schema first and does
+nothing when it has already been applied, so upgrade() can be run repeatedly.
+"""
+from typing import Callable, List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.models import NewsArticle, SentimentAnalysis, Watchlist
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return column in {info["name"] for info in inspect(conn).get_columns(table)}
+
+def _add_column(conn: Connection, model, name: str) -> None:
+    """Add a model column and its index to an existing table."""
+    table = model.__table__
+    column = table.c[name]
+    if _has_column(conn, table.name, name):
+        return
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {name} {column.type.compile(dialect=conn.dialect)}"
+    for foreign_key in column.foreign_keys:
+        ddl += f" REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+    conn.execute(text(ddl))
+    for index in table.indexes:
+        if [indexed.name for indexed in index.columns] == [name]:
+            index.create(conn, checkfirst=True)
+    print(f"Added {table.name}.{name}")
+
+def add_news_article_canonical_id(conn: Connection) -> None:
+    """Near-duplicate articles point at their canonical article."""
+    _add_column(conn, NewsArticle, "canonical_id")
+
+def add_sentiment_model_version(conn: Connection) -> None:
+    """Sentiment rows record the model version that produced them."""
+    _add_column(conn, SentimentAnalysis, "model_version")
+
+def add_watchlist_unique_symbol(conn: Connection) -> None:
+    """
+    One row per user and symbol, stored in upper case.
+
+    Symbols used to be stored as typed, so existing rows are upper-cased and
+    case-insensitive duplicates are removed, keeping the oldest row, before
+    the constraint is added.
+    """
+    name = "uq_watchlist_user_symbol"
+    inspector = inspect(conn)
+    existing = {constraint["name"] for constraint in inspector.get_unique_constraints(Watchlist.__tablename__)}
+    existing |= {index["name"] for index in inspector.get_indexes(Watchlist.__tablename__)}
+    if name in existing:
+        return
+
+    removed = conn.execute(text("""
+        DELETE FROM watchlist
+        WHERE id NOT IN (SELECT MIN(id) FROM watchlist GROUP BY user_id, UPPER(TRIM(symbol)))
+    """)).rowcount
+    conn.execute(text("UPDATE watchlist SET symbol = UPPER(TRIM(symbol)) WHERE symbol <> UPPER(TRIM(symbol))"))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"ALTER TABLE watchlist ADD CONSTRAINT {name} UNIQUE (user_id, symbol)"))
+    else:
+        # SQLite cannot add constraints to a table; a unique index serves ON CONFLICT the same way
+        conn.execute(text(f"CREATE UNIQUE INDEX {name} ON watchlist (user_id, symbol)"))
+    print(f"Added {name}, removed {removed} duplicate watchlist rows")
+
+# Applied in order
+MIGRATIONS: List[Callable[[Connection], None]] = [
+    add_news_article_canonical_id,
+    add_sentiment_model_version,
+    add_watchlist_unique_symbol,
+]
+
+def upgrade(engine: Engine) -> None:
+    """Apply every pending migration in one transaction."""
+    with engine.begin() as conn:
+        for migration in MIGRATIONS:
+            migration(conn)
@@ -13,9 +13,22 @@ class NewsArticle(Base):
     published_at = Column(DateTime, default=datetime.utcnow)
     ticker = Column(String(10), index=True)  # Stock ticker symbol
     content = Column(Text, nullable=True)
+    canonical_id = Column(Integer, ForeignKey("news_articles.id"), nullable=True, index=True)  # Set for near-duplicates
     
     # Relationships
     sentiment_analysis = relationship("SentimentAnalysis", back_populates="article", cascade="all, delete-orphan")
+    tickers = relationship("ArticleTicker", back_populates="article", cascade="all, delete-orphan")
+
+class ArticleTicker(Base):
+    __tablename__ = "article_tickers"
+    __table_args__ = (UniqueConstraint("article_id", "ticker", name="uq_article_ticker"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    article_id = Column(Integer, ForeignKey("news_articles.id"), nullable=False, index=True)
+    ticker = Column(String(10), nullable=False, index=True)  # Ticker mentioned in the article
+    
+    # Relationships
+    article = relationship("NewsArticle", back_populates="tickers")
 
 class SentimentAnalysis(Base):
     __tablename__ = "sentiment_analysis"
@@ -25,6 +38,7 @@ class SentimentAnalysis(Base):
     score = Column(Float)  # Sentiment score between -1 and 1
     label = Column(String(20))  # Positive, Negative, or Neutral
     confidence = Column(Float)  # Confidence score of the analysis
+    model_version = Column(String(100), nullable=True, index=True)  # Model that produced it, or "human"
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -43,6 +57,7 @@ class User(Base):
 
 class Watchlist(Base):
     __tablename__ = "watchlist"
+    __table_args__ = (UniqueConstraint("user_id", "symbol", name="uq_watchlist_user_symbol"),)
 
     id = Column(Integer, primary_key=True, index=True)
     symbol = Column(String(20), index=True, nullable=False)
@@ -1,6 +1,9 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.routes import router
+from app.services.metrics import metrics
 
 app = FastAPI(title="Financial News Sentiment API")
 
@@ -14,4 +17,31 @@ app.add_middleware(
 )
 
 # Include routers
-app.include_router(router, prefix="/api")
\ No newline at end of file
+app.include_router(router, prefix="/api")
+
+REQUEST_LATENCY = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Use the route template so '/api/news/AAPL' and '/api/news/MSFT' share a series
+        route = request.scope.get("route")
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=str(status)
+        )
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics() -> PlainTextResponse:
+    """Expose collected metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
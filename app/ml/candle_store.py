@@ -0,0 +1,173 @@
+import os
+import re
+import time
+from datetime import datetime, time as dtime, timedelta
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+
+CANDLE_COLUMNS = ("t", "open", "high", "low", "close", "volume")
+
+# Longest history Yahoo serves for each intraday interval, in days
+MAX_HISTORY_DAYS = {"1m": 7, "5m": 60, "15m": 60, "30m": 60, "60m": 730, "1h": 730, "1d": 3650}
+INTERVAL_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "30m": 1800, "60m": 3600, "1h": 3600, "1d": 86400}
+
+# Regular US trading session; the end leaves Yahoo time to publish the closing candles
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+SESSION_OPEN = dtime(9, 30)
+SESSION_END = dtime(16, 15)
+
+Candles = Dict[str, np.ndarray]
+
+class CandleStore:
+    """
+    Local columnar cache of price candles.
+
+    Candles for each ticker and interval are kept as one compressed NumPy archive
+    holding a separate array per column. After the first download only the
+    candles newer than the last cached one are requested from Yahoo Finance,
+    and outside trading hours nothing is requested once the cache was
+    refreshed after the last session ended.
+
+    Args:
+        cache_dir (str): Directory holding the candle archives
+    """
+
+    def __init__(self, cache_dir: str = settings.CANDLE_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, ticker: str, interval: str) -> str:
+        safe_ticker = re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper())
+        return os.path.join(self.cache_dir, f"{safe_ticker}_{interval}.npz")
+
+    def get_candles(self, ticker: str, interval: str = "1h", days: int = 30) -> Candles:
+        """
+        Get candles for a ticker, downloading only what is missing from the cache.
+
+        Args:
+            ticker (str): Stock ticker symbol (e.g., 'AAPL')
+            interval (str): Candle interval understood by Yahoo Finance (e.g., '1h')
+            days (int): Number of days of history to return
+
+        Returns:
+            Candles: Column arrays sorted by timestamp (epoch seconds)
+        """
+        if interval not in MAX_HISTORY_DAYS:
+            raise ValueError(f"Unsupported interval '{interval}'")
+        days = min(days, MAX_HISTORY_DAYS[interval])
+        now = int(time.time())
+        start = now - days * 24 * 3600
+
+        path = self._path(ticker, interval)
+        cached = load_candle_file(path) if os.path.exists(path) else None
+        if cached is None or not len(cached["t"]) or cached["t"][0] > start:
+            candles = self._download(ticker, interval, start)
+        elif self._is_current(path, cached, interval, now):
+            return slice_candles(cached, start)
+        else:
+            # Refetch from the last cached candle, which may have been incomplete
+            candles = merge_candles(cached, self._download(ticker, interval, int(cached["t"][-1])))
+        self._save(path, candles)
+        return slice_candles(candles, start)
+
+    def _is_current(self, path: str, cached: Candles, interval: str, now: int) -> bool:
+        """Whether a download could return candles newer than the cached ones."""
+        session_end = last_session_end(now)
+        if session_end is None:
+            # The last cached candle is still the current one
+            return now - cached["t"][-1] < INTERVAL_SECONDS[interval]
+        # Outside trading hours nothing changes after a download made once the last session ended
+        return os.path.getmtime(path) >= session_end
+
+    def _download(self, ticker: str, interval: str, start: int) -> Candles:
+        import yfinance as yf
+
+        frame = yf.Ticker(ticker).history(start=pd.Timestamp(start, unit="s", tz="UTC"), interval=interval)
+        if frame.empty:
+            return empty_candles()
+        return {
+            "t": (frame.index.asi8 // 10 ** 9).astype(np.int64),
+            "open": frame["Open"].to_numpy(dtype=np.float64),
+            "high": frame["High"].to_numpy(dtype=np.float64),
+            "low": frame["Low"].to_numpy(dtype=np.float64),
+            "close": frame["Close"].to_numpy(dtype=np.float64),
+            "volume": frame["Volume"].to_numpy(dtype=np.float64),
+        }
+
+    def _save(self, path: str, candles: Candles) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, **candles)
+        os.replace(tmp_path, path)
+
+def last_session_end(now: int) -> Optional[int]:
+    """
+    End of the most recent regular trading session before now.
+
+    Weekends are skipped. Exchange holidays are not known, so on a holiday
+    the cache is refreshed as if the market had traded.
+
+    Args:
+        now (int): Epoch seconds
+
+    Returns:
+        Optional[int]: Epoch seconds of the session end, None while a session is in progress
+    """
+    local = datetime.fromtimestamp(now, MARKET_TIMEZONE)
+    is_weekday = local.weekday() < 5
+    if is_weekday and SESSION_OPEN <= local.time() < SESSION_END:
+        return None
+    day = local.date()
+    if not is_weekday or local.time() < SESSION_OPEN:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return int(datetime.combine(day, SESSION_END, MARKET_TIMEZONE).timestamp())
+
+def empty_candles() -> Candles:
+    return {column: np.empty(0, dtype=np.int64 if column == "t" else np.float64) for column in CANDLE_COLUMNS}
+
+def merge_candles(cached: Candles, fresh: Candles) -> Candles:
+    """Append fresh candles to cached ones, letting fresh rows replace overlapping timestamps."""
+    if not len(fresh["t"]):
+        return cached
+    keep = cached["t"] < fresh["t"][0]
+    return {column: np.concatenate([cached[column][keep], fresh[column]]) for column in CANDLE_COLUMNS}
+
+def slice_candles(candles: Candles, start: int, end: Optional[int] = None) -> Candles:
+    """Return the candles with start <= t (< end) without copying."""
+    lo = int(np.searchsorted(candles["t"], start, side="left"))
+    hi = len(candles["t"]) if end is None else int(np.searchsorted(candles["t"], end, side="left"))
+    return {column: candles[column][lo:hi] for column in CANDLE_COLUMNS}
+
+def load_candle_file(path: str) -> Candles:
+    """
+    Load candles from a .npz archive or a CSV file.
+
+    CSV files need a header with t (epoch seconds), open, high, low, close
+    and volume columns.
+
+    Args:
+        path (str): Path to the candle file
+
+    Returns:
+        Candles: Column arrays sorted by timestamp
+    """
+    if path.endswith(".csv"):
+        frame = pd.read_csv(path)
+        archive = {column: frame[column].to_numpy() for column in CANDLE_COLUMNS}
+    else:
+        with np.load(path) as data:
+            archive = {column: data[column] for column in CANDLE_COLUMNS}
+    order = np.argsort(archive["t"], kind="stable")
+    return {
+        column: archive[column][order].astype(np.int64 if column == "t" else np.float64)
+        for column in CANDLE_COLUMNS
+    }
+
+# Create a singleton instance
+candle_store = CandleStore()
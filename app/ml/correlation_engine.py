@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.database.database import SessionLocal
+from app.ml.candle_store import Candles, candle_store, load_candle_file, slice_candles
+from app.ml.sentiment_series import finite_or_none, load_sentiment_series
+
+class SentimentPriceCorrelator:
+    """
+    Relate a ticker's news sentiment to its price moves.
+
+    Article sentiment is bucketed onto the candle grid, then compared with
+    candle log returns through lagged cross-correlation, rolling correlation
+    and sentiment momentum. Every step is vectorized over the whole series.
+    """
+
+    def analyze_ticker(
+        self,
+        ticker: str,
+        interval: str = "1h",
+        days: int = 30,
+        max_lag: int = 24,
+        window: int = 24,
+        candle_file: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Correlate stored sentiment of a ticker with its price candles.
+
+        Args:
+            ticker (str): Stock ticker symbol (e.g., 'AAPL')
+            interval (str): Candle interval (e.g., '1h')
+            days (int): Days of history to analyze
+            max_lag (int): Largest lead/lag, in candles, for the cross-correlation
+            window (int): Rolling correlation window, in candles
+            candle_file (Optional[str]): Read candles from this file instead of the cache
+
+        Returns:
+            Dict[str, Any]: Correlation analysis results
+        """
+        since = datetime.now() - timedelta(days=days)
+        if candle_file is not None:
+            candles = slice_candles(load_candle_file(candle_file), int(since.timestamp()))
+        else:
+            candles = candle_store.get_candles(ticker, interval, days)
+
+        with SessionLocal() as db:
+            timestamps, scores = load_sentiment_series(db, ticker, since)
+
+        return self.correlate(timestamps, scores, candles, max_lag=max_lag, window=window)
+
+    def correlate(
+        self,
+        timestamps: np.ndarray,
+        scores: np.ndarray,
+        candles: Candles,
+        max_lag: int = 24,
+        window: int = 24,
+        fast_span: int = 6,
+        slow_span: int = 24
+    ) -> Dict[str, Any]:
+        """
+        Correlate a sentiment series with price candles.
+
+        Args:
+            timestamps (np.ndarray): Epoch seconds of each article
+            scores (np.ndarray): Signed sentiment score of each article
+            candles (Candles): Candle columns sorted by timestamp
+            max_lag (int): Largest lead/lag, in candles, for the cross-correlation
+            window (int): Rolling correlation window, in candles
+            fast_span (int): Span of the fast sentiment EMA
+            slow_span (int): Span of the slow sentiment EMA
+
+        Returns:
+            Dict[str, Any]: Cross-correlation by lag, rolling correlation and momentum
+        """
+        candle_times = candles["t"]
+        if len(candle_times) < 3:
+            raise ValueError("Not enough candles to correlate")
+
+        sentiment, article_counts = self._bucket_sentiment(timestamps, scores, candle_times)
+        # Return of each candle relative to the previous close
+        returns = np.diff(np.log(candles["close"]))
+        sentiment, article_counts, bucket_times = sentiment[1:], article_counts[1:], candle_times[1:]
+
+        lags, cross_correlation = self._cross_correlation(sentiment, returns, max_lag)
+        best = int(np.nanargmax(np.abs(cross_correlation))) if np.isfinite(cross_correlation).any() else None
+        rolling = self._rolling_correlation(sentiment, returns, window)
+        momentum = self._momentum(sentiment, fast_span, slow_span)
+
+        return {
+            "candles": int(len(returns)),
+            "articles": int(article_counts.sum()),
+            "covered_buckets": int(np.count_nonzero(article_counts)),
+            "cross_correlation": [
+                {"lag": int(lag), "correlation": finite_or_none(value)}
+                for lag, value in zip(lags, cross_correlation)
+            ],
+            "best_lag": None if best is None else {
+                "lag": int(lags[best]),
+                "correlation": finite_or_none(cross_correlation[best])
+            },
+            "rolling_correlation": {
+                "window": window,
+                "latest": finite_or_none(rolling[-1]) if len(rolling) else None,
+                "series": [
+                    {"t": int(t), "correlation": finite_or_none(value)}
+                    for t, value in zip(bucket_times[window - 1:], rolling)
+                ]
+            },
+            "momentum": {
+                "latest": finite_or_none(momentum[-1]),
+                "series": [
+                    {"t": int(t), "sentiment": float(s), "momentum": float(m)}
+                    for t, s, m in zip(bucket_times, sentiment, momentum)
+                ]
+            }
+        }
+
+    def _bucket_sentiment(self, timestamps: np.ndarray, scores: np.ndarray, candle_times: np.ndarray):
+        """Average article sentiment per candle; articles before the first candle are dropped."""
+        buckets = np.searchsorted(candle_times, timestamps, side="right") - 1
+        valid = buckets >= 0
+        counts = np.bincount(buckets[valid], minlength=len(candle_times)).astype(np.float64)
+        # bincount returns integers when no weights survive, so cast before dividing in place
+        totals = np.bincount(buckets[valid], weights=scores[valid], minlength=len(candle_times)).astype(np.float64)
+        mean = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+        return mean, counts
+
+    def _cross_correlation(self, sentiment: np.ndarray, returns: np.ndarray, max_lag: int):
+        """
+        Pearson correlation of sentiment at t with returns at t + lag.
+
+        Positive lags mean sentiment leads price.
+        """
+        n = len(sentiment)
+        max_lag = min(max_lag, n - 2)
+        lags = np.arange(-max_lag, max_lag + 1)
+        correlations = np.full(len(lags), np.nan)
+        for index, lag in enumerate(lags):
+            if lag >= 0:
+                x, y = sentiment[:n - lag], returns[lag:]
+            else:
+                x, y = sentiment[-lag:], returns[:n + lag]
+            correlations[index] = _pearson(x, y)
+        return lags, correlations
+
+    def _rolling_correlation(self, x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+        """Rolling Pearson correlation computed from cumulative sums in O(n)."""
+        if window < 2 or len(x) < window:
+            return np.empty(0)
+
+        def rolling_sum(values: np.ndarray) -> np.ndarray:
+            cumulative = np.concatenate([[0.0], np.cumsum(values)])
+            return cumulative[window:] - cumulative[:-window]
+
+        sum_x, sum_y = rolling_sum(x), rolling_sum(y)
+        sum_xy, sum_xx, sum_yy = rolling_sum(x * y), rolling_sum(x * x), rolling_sum(y * y)
+        covariance = sum_xy - sum_x * sum_y / window
+        variance_x = sum_xx - sum_x ** 2 / window
+        variance_y = sum_yy - sum_y ** 2 / window
+        denominator = np.sqrt(np.clip(variance_x * variance_y, 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(denominator > 1e-12, covariance / denominator, np.nan)
+
+    def _momentum(self, sentiment: np.ndarray, fast_span: int, slow_span: int) -> np.ndarray:
+        """Difference between a fast and a slow exponential moving average of sentiment."""
+        series = pd.Series(sentiment)
+        fast = series.ewm(span=fast_span, adjust=False).mean()
+        slow = series.ewm(span=slow_span, adjust=False).mean()
+        return (fast - slow).to_numpy()
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    if len(x) < 2:
+        return np.nan
+    x_centered, y_centered = x - x.mean(), y - y.mean()
+    denominator = np.sqrt((x_centered ** 2).sum() * (y_centered ** 2).sum())
+    return float((x_centered * y_centered).sum() / denominator) if denominator > 1e-12 else np.nan
+
+# Create singleton instance
+correlation_engine = SentimentPriceCorrelator()
@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.database.database import SessionLocal
+from app.ml.sentiment_series import finite_or_none, load_sentiment_arrays
+
+class CrossSectionalAnalyzer:
+    """
+    Compare sentiment across many tickers at once.
+
+    Stored sentiment for every requested ticker is loaded with one query and
+    binned into a ticker x time-bucket matrix. Z-scores, group aggregates and
+    mover rankings are then computed on the whole matrix with NumPy.
+    """
+
+    def analyze(
+        self,
+        tickers: Sequence[str],
+        groups: Optional[Dict[str, Sequence[str]]] = None,
+        lookback_days: int = 7,
+        bucket_hours: int = 6,
+        recent_buckets: int = 1,
+        top: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Load stored sentiment and analyze it cross-sectionally.
+
+        Args:
+            tickers (Sequence[str]): Ticker symbols to analyze
+            groups (Optional[Dict[str, Sequence[str]]]): Sector or watchlist name to member tickers
+            lookback_days (int): Days of history to include
+            bucket_hours (int): Width of each time bucket in hours
+            recent_buckets (int): Number of latest buckets compared against the rest
+            top (int): Number of movers to return in each direction
+
+        Returns:
+            Dict[str, Any]: Per-ticker statistics, group aggregates and movers
+        """
+        tickers = list(dict.fromkeys(tickers))
+        end = datetime.now()
+        start = end - timedelta(days=lookback_days)
+        with SessionLocal() as db:
+            ticker_index, timestamps, scores = load_sentiment_arrays(db, tickers, start)
+
+        bucket_seconds = bucket_hours * 3600
+        n_buckets = max(1, int(np.ceil((end - start).total_seconds() / bucket_seconds)))
+        sums, counts = self.build_matrix(
+            ticker_index, timestamps, scores, len(tickers), int(start.timestamp()), bucket_seconds, n_buckets
+        )
+        result = self.summarize(tickers, sums, counts, groups or {}, recent_buckets, top)
+        result["buckets"] = {
+            "start": int(start.timestamp()),
+            "bucket_seconds": bucket_seconds,
+            "count": n_buckets
+        }
+        return result
+
+    def build_matrix(
+        self,
+        ticker_index: np.ndarray,
+        timestamps: np.ndarray,
+        scores: np.ndarray,
+        n_tickers: int,
+        start: int,
+        bucket_seconds: int,
+        n_buckets: int
+    ):
+        """
+        Bin article sentiment into ticker x bucket sum and count matrices.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Sum of scores and article count per cell
+        """
+        buckets = (timestamps - start) // bucket_seconds
+        valid = (buckets >= 0) & (buckets < n_buckets)
+        cells = ticker_index[valid].astype(np.int64) * n_buckets + buckets[valid]
+        size = n_tickers * n_buckets
+        sums = np.bincount(cells, weights=scores[valid], minlength=size).reshape(n_tickers, n_buckets)
+        counts = np.bincount(cells, minlength=size).reshape(n_tickers, n_buckets).astype(np.float64)
+        return sums, counts
+
+    def summarize(
+        self,
+        tickers: List[str],
+        sums: np.ndarray,
+        counts: np.ndarray,
+        groups: Dict[str, Sequence[str]],
+        recent_buckets: int = 1,
+        top: int = 10
+    ) -> Dict[str, Any]:
+        """Compute z-scores, group aggregates and movers from the sentiment matrices."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)
+
+            recent_buckets = max(1, min(recent_buckets, means.shape[1] - 1))
+            history = means[:, :-recent_buckets]
+            recent_sum = sums[:, -recent_buckets:].sum(axis=1)
+            recent_count = counts[:, -recent_buckets:].sum(axis=1)
+            recent = np.where(recent_count > 0, recent_sum / recent_count, np.nan)
+
+            # Bucket-level baseline so busy news days don't dominate the spread
+            history_observed = np.isfinite(history).sum(axis=1)
+            baseline = np.where(history_observed > 0, np.nansum(history, axis=1) / np.maximum(history_observed, 1), np.nan)
+            deviations = np.where(np.isfinite(history), history - baseline[:, None], 0.0)
+            spread = np.sqrt((deviations ** 2).sum(axis=1) / np.maximum(history_observed - 1, 1))
+            spread = np.where(history_observed > 1, spread, np.nan)
+
+            change = recent - baseline
+            z_scores = np.where(spread > 1e-9, change / spread, np.nan)
+
+            total_count = counts.sum(axis=1)
+            overall = np.where(total_count > 0, sums.sum(axis=1) / total_count, np.nan)
+
+        per_ticker = {
+            ticker: {
+                "article_count": int(total_count[i]),
+                "mean_sentiment": finite_or_none(overall[i]),
+                "recent_sentiment": finite_or_none(recent[i]),
+                "baseline_sentiment": finite_or_none(baseline[i]),
+                "change": finite_or_none(change[i]),
+                "z_score": finite_or_none(z_scores[i])
+            }
+            for i, ticker in enumerate(tickers)
+        }
+
+        return {
+            "tickers": per_ticker,
+            "groups": self._aggregate_groups(tickers, sums, counts, z_scores, groups),
+            "movers": self._rank_movers(tickers, z_scores, top)
+        }
+
+    def _aggregate_groups(
+        self,
+        tickers: List[str],
+        sums: np.ndarray,
+        counts: np.ndarray,
+        z_scores: np.ndarray,
+        groups: Dict[str, Sequence[str]]
+    ) -> Dict[str, Any]:
+        """Article-weighted sentiment per bucket and mean z-score for each group."""
+        if not groups:
+            return {}
+        positions = {ticker: index for index, ticker in enumerate(tickers)}
+        names = list(groups)
+        # Membership matrix (groups x tickers) turns every aggregate into one matmul
+        membership = np.zeros((len(names), len(tickers)))
+        for row, name in enumerate(names):
+            members = [positions[ticker] for ticker in groups[name] if ticker in positions]
+            membership[row, members] = 1.0
+
+        group_sums, group_counts = membership @ sums, membership @ counts
+        finite_z = np.isfinite(z_scores)
+        z_members = membership @ finite_z
+        with np.errstate(divide="ignore", invalid="ignore"):
+            series = np.where(group_counts > 0, group_sums / group_counts, np.nan)
+            totals = group_counts.sum(axis=1)
+            mean = np.where(totals > 0, group_sums.sum(axis=1) / totals, np.nan)
+            mean_z = np.where(z_members > 0, (membership @ np.where(finite_z, z_scores, 0.0)) / z_members, np.nan)
+
+        return {
+            name: {
+                "tickers": int(membership[row].sum()),
+                "article_count": int(totals[row]),
+                "mean_sentiment": finite_or_none(mean[row]),
+                "mean_z_score": finite_or_none(mean_z[row]),
+                "series": [finite_or_none(value) for value in series[row]]
+            }
+            for row, name in enumerate(names)
+        }
+
+    def _rank_movers(self, tickers: List[str], z_scores: np.ndarray, top: int) -> Dict[str, Any]:
+        """Tickers with the largest positive and negative sentiment z-scores."""
+        finite = np.flatnonzero(np.isfinite(z_scores))
+        order = finite[np.argsort(z_scores[finite], kind="stable")]
+        return {
+            "up": [{"ticker": tickers[i], "z_score": float(z_scores[i])} for i in order[::-1][:top] if z_scores[i] > 0],
+            "down": [{"ticker": tickers[i], "z_score": float(z_scores[i])} for i in order[:top] if z_scores[i] < 0]
+        }
+
+# Create singleton instance
+cross_sectional_analyzer = CrossSectionalAnalyzer()
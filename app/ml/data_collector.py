@@ -1,8 +1,12 @@
 import os
+import argparse
 import finnhub
 import pandas as pd
+import tracemalloc
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from itertools import islice
+from typing import List, Dict, Any, Iterator
 import json
 from dotenv import load_dotenv
 import logging
@@ -11,6 +15,71 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CATEGORIES = ['general', 'forex', 'crypto', 'merger']
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+class StageProfiler:
+    """
+    Track peak traced memory and top allocation sites per pipeline stage with tracemalloc.
+
+    A stage may run many times (once per chunk). Peaks are tracked on every
+    run, while allocation sites are only snapshotted on a stage's first run,
+    since snapshots are far slower than the stage itself. When disabled every
+    stage is a no-op.
+
+    Args:
+        enabled (bool): Start tracemalloc and record stages
+        top (int): Allocation sites to keep per stage
+    """
+    
+    def __init__(self, enabled: bool = False, top: int = 5):
+        self.enabled = enabled
+        self.top = top
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        record = self.stages.setdefault(name, {"runs": 0, "peak_bytes": 0, "retained_bytes": 0, "top_sites": []})
+        before = self._snapshot() if record["runs"] == 0 else None
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            record["runs"] += 1
+            record["peak_bytes"] = max(record["peak_bytes"], peak - start)
+            record["retained_bytes"] = max(record["retained_bytes"], current - start)
+            if before is not None:
+                record["top_sites"] = [
+                    f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} {stat.size_diff / 1024:+.1f} KiB"
+                    for stat in self._snapshot().compare_to(before, "lineno")[:self.top]
+                ]
+    
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        # Leave out the profiler's own bookkeeping
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+    
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        logger.info(f"Peak traced memory: {peak / 1024 / 1024:.2f} MiB")
+        for name, record in self.stages.items():
+            logger.info(f"Stage {name}: {record['runs']} run(s), peak {record['peak_bytes'] / 1024 / 1024:.2f} MiB, "
+                        f"retained {record['retained_bytes'] / 1024 / 1024:.2f} MiB")
+            for site in record["top_sites"]:
+                logger.info(f"    {site}")
+
 class FinancialNewsCollector:
     def __init__(self):
         load_dotenv()
@@ -20,6 +89,7 @@ class FinancialNewsCollector:
         
         logger.info("Initializing Finnhub client...")
         self.client = finnhub.Client(api_key=self.api_key)
+        self.profiler = StageProfiler()
         
     def collect_news(self, days_back: int = 30) -> pd.DataFrame:
         """
@@ -37,67 +107,147 @@ class FinancialNewsCollector:
         logger.info(f"Collecting news from {start_date} to {end_date}")
         
         # Get news from major financial categories
-        categories = [
-            'general',
-            'forex',
-            'crypto',
-            'merger'
-        ]
+        with self.profiler.stage("fetch"):
+            all_articles = list(self.iter_articles(start_date))
+        
+        if not all_articles:
+            raise ValueError("No articles collected")
+        
+        logger.info(f"Total articles collected: {len(all_articles)}")
+        
+        with self.profiler.stage("transform"):
+            # Convert to DataFrame
+            df = pd.DataFrame(all_articles)
+            
+            # Keep only relevant columns and rename them
+            df = df[['headline', 'summary', 'category', 'datetime']]
+            df.columns = ['title', 'description', 'category', 'publishedAt']
+            
+            # Combine title and description for better context
+            df['text'] = df['title'] + ' ' + df['description'].fillna('')
+            
+            # Tag every article with the tickers it mentions
+            tagger = self._ticker_tagger()
+            df['tickers'] = [tagger.tag(text) for text in df['text']]
+            
+            # Add placeholder labels
+            df['label'] = 'neutral'  # Default label
         
-        all_articles = []
+        # Save raw data
+        with self.profiler.stage("write"):
+            self._save_raw_data(df)
         
-        for category in categories:
+        return df
+    
+    def iter_articles(self, start_date: datetime) -> Iterator[Dict[str, Any]]:
+        """Yield Finnhub articles of every category published after start_date, one category at a time."""
+        for category in CATEGORIES:
             try:
                 logger.info(f"Fetching news for category: {category}")
                 # Get news for the category
                 news = self.client.general_news(category, min_id=0)
-                
-                if not news:
-                    logger.warning(f"No news found for category: {category}")
-                    continue
-                
-                # Filter by date
-                filtered_news = [
-                    article for article in news
-                    if datetime.fromtimestamp(article['datetime']) >= start_date
-                ]
-                
-                logger.info(f"Found {len(filtered_news)} articles for category {category}")
-                all_articles.extend(filtered_news)
-                
             except Exception as e:
                 logger.error(f"Error collecting news from category {category}: {str(e)}")
+                continue
+            
+            if not news:
+                logger.warning(f"No news found for category: {category}")
+                continue
+            
+            # Filter by date
+            found = 0
+            for article in news:
+                if datetime.fromtimestamp(article['datetime']) >= start_date:
+                    found += 1
+                    yield article
+            logger.info(f"Found {found} articles for category {category}")
+    
+    def collect_news_chunked(self, days_back: int = 30, chunk_size: int = 256, label: bool = True) -> str:
+        """
+        Collect, tag, label and save news in fixed-size chunks with bounded memory.
         
-        if not all_articles:
-            raise ValueError("No articles collected")
-        
-        logger.info(f"Total articles collected: {len(all_articles)}")
+        Each chunk goes through fetch, transform, label and write before the
+        next one is read, and is appended to a JSON Lines file, so memory use
+        depends on chunk_size rather than on how many articles are collected.
         
-        # Convert to DataFrame
-        df = pd.DataFrame(all_articles)
+        Args:
+            days_back (int): Number of days to look back for news
+            chunk_size (int): Articles processed at a time
+            label (bool): Label every chunk with the sentiment model
         
-        # Keep only relevant columns and rename them
-        df = df[['headline', 'summary', 'category', 'datetime']]
-        df.columns = ['title', 'description', 'category', 'publishedAt']
+        Returns:
+            str: Path of the JSON Lines file
+        """
+        start_date = datetime.now() - timedelta(days=days_back)
+        logger.info(f"Collecting news since {start_date} in chunks of {chunk_size}")
         
-        # Combine title and description for better context
-        df['text'] = df['title'] + ' ' + df['description'].fillna('')
+        tagger = self._ticker_tagger()
+        if label:
+            from .sentiment_analyzer import sentiment_analyzer
         
-        # Add placeholder labels
-        df['label'] = 'neutral'  # Default label
+        os.makedirs(DATA_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = "labeled_news" if label else "raw_news"
+        filepath = os.path.join(DATA_DIR, f"{prefix}_{timestamp}.jsonl")
         
-        # Save raw data
-        self._save_raw_data(df)
+        articles = self.iter_articles(start_date)
+        total = 0
+        with open(filepath, "w") as f:
+            while True:
+                with self.profiler.stage("fetch"):
+                    chunk = list(islice(articles, chunk_size))
+                if not chunk:
+                    break
+                
+                with self.profiler.stage("transform"):
+                    records = [self._to_record(article, tagger) for article in chunk]
+                    del chunk
+                
+                if label:
+                    with self.profiler.stage("label"):
+                        results = sentiment_analyzer.analyze_batch([record['text'] for record in records])
+                        for record, result in zip(records, results):
+                            record['label'] = result['label']
+                
+                with self.profiler.stage("write"):
+                    for record in records:
+                        f.write(json.dumps(record) + "\n")
+                    f.flush()
+                
+                total += len(records)
+                logger.info(f"Saved {total} articles")
         
-        return df
+        if not total:
+            os.remove(filepath)
+            raise ValueError("No articles collected")
+        logger.info(f"Collected {total} articles into {filepath}")
+        return filepath
+    
+    def _ticker_tagger(self):
+        from .ticker_tagger import load_ticker_tagger
+        return load_ticker_tagger(lambda: self.client.stock_symbols('US'))
+    
+    @staticmethod
+    def _to_record(article: Dict[str, Any], tagger: Any) -> Dict[str, Any]:
+        """Same fields as the DataFrame rows of collect_news."""
+        description = article.get('summary') or ''
+        text = f"{article.get('headline', '')} {description}"
+        return {
+            'title': article.get('headline'),
+            'description': description,
+            'category': article.get('category'),
+            'publishedAt': article.get('datetime'),
+            'text': text,
+            'tickers': tagger.tag(text),
+            'label': 'neutral'
+        }
     
     def _save_raw_data(self, df: pd.DataFrame):
         """Save raw collected data to a JSON file"""
-        data_dir = os.path.join(os.path.dirname(__file__), "data")
-        os.makedirs(data_dir, exist_ok=True)
+        os.makedirs(DATA_DIR, exist_ok=True)
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filepath = os.path.join(data_dir, f"raw_news_{timestamp}.json")
+        filepath = os.path.join(DATA_DIR, f"raw_news_{timestamp}.json")
         
         df.to_json(filepath, orient='records', indent=2)
         logger.info(f"Raw data saved to {filepath}")
@@ -114,45 +264,71 @@ class FinancialNewsCollector:
         predictions = []
         total = len(df)
         
-        for idx, text in enumerate(df['text'], 1):
-            try:
-                result = sentiment_analyzer.analyze_text(text)
-                predictions.append(result['label'])
-                if idx % 10 == 0:  # Log progress every 10 articles
-                    logger.info(f"Labeled {idx}/{total} articles")
-            except Exception as e:
-                logger.error(f"Error labeling article {idx}: {str(e)}")
-                predictions.append('neutral')  # Default to neutral on error
-        
-        df['label'] = predictions
+        with self.profiler.stage("label"):
+            for idx, text in enumerate(df['text'], 1):
+                try:
+                    result = sentiment_analyzer.analyze_text(text)
+                    predictions.append(result['label'])
+                    if idx % 10 == 0:  # Log progress every 10 articles
+                        logger.info(f"Labeled {idx}/{total} articles")
+                except Exception as e:
+                    logger.error(f"Error labeling article {idx}: {str(e)}")
+                    predictions.append('neutral')  # Default to neutral on error
+            
+            df['label'] = predictions
         
         # Save labeled data
-        data_dir = os.path.join(os.path.dirname(__file__), "data")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filepath = os.path.join(data_dir, f"labeled_news_{timestamp}.json")
+        filepath = os.path.join(DATA_DIR, f"labeled_news_{timestamp}.json")
         
-        df.to_json(filepath, orient='records', indent=2)
+        with self.profiler.stage("write"):
+            df.to_json(filepath, orient='records', indent=2)
         logger.info(f"Labeled data saved to {filepath}")
         
         return df
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Collect and label financial news from Finnhub")
+    parser.add_argument("--days-back", type=int, default=30, help="Number of days to look back for news")
+    parser.add_argument("--chunked", action="store_true",
+                        help="Process articles in fixed-size chunks and append them to a JSON Lines file")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Articles per chunk in chunked mode")
+    parser.add_argument("--no-label", action="store_true", help="Skip sentiment labeling in chunked mode")
+    parser.add_argument("--profile", action="store_true",
+                        help="Report peak memory and top allocation sites per stage with tracemalloc")
+    parser.add_argument("--profile-top", type=int, default=5, help="Allocation sites reported per stage")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     collector = FinancialNewsCollector()
+    collector.profiler = StageProfiler(enabled=args.profile, top=args.profile_top)
     
     try:
-        # Collect news
-        logger.info("Starting news collection...")
-        df = collector.collect_news(days_back=30)
-        
-        # Label data
-        logger.info("Starting data labeling...")
-        labeled_df = collector.label_data(df)
-        
-        logger.info(f"Successfully collected and labeled {len(labeled_df)} articles")
+        if args.chunked:
+            logger.info("Starting chunked news collection...")
+            filepath = collector.collect_news_chunked(
+                days_back=args.days_back,
+                chunk_size=args.chunk_size,
+                label=not args.no_label
+            )
+            logger.info(f"Successfully collected articles into {filepath}")
+        else:
+            # Collect news
+            logger.info("Starting news collection...")
+            df = collector.collect_news(days_back=args.days_back)
+            
+            # Label data
+            logger.info("Starting data labeling...")
+            labeled_df = collector.label_data(df)
+            
+            logger.info(f"Successfully collected and labeled {len(labeled_df)} articles")
         
     except Exception as e:
         logger.error(f"Error in data collection: {str(e)}")
         raise
+    finally:
+        collector.profiler.report()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
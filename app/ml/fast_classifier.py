@@ -0,0 +1,217 @@
+"""
+Hashed n-gram sentiment classifier distilled from the transformer.
+
+The transformer labels our stored headlines, and a linear model over hashed
+word and character n-grams is trained to reproduce those labels. In cascade
+mode SentimentAnalyzer scores every headline with it first and only sends
+the ones it is unsure about to the transformer.
+
+Usage:
+    python -m app.ml.fast_classifier
+    python -m app.ml.fast_classifier --limit 100000 --thresholds 0.7 0.8 0.9 0.95
+"""
+import argparse
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import FeatureUnion
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class FastSentimentClassifier:
+    """
+    Logistic regression over hashed word and character n-grams.
+
+    The hashing vectorizers are stateless, so scoring a headline is a
+    tokenization pass and one sparse dot product with no vocabulary to load.
+
+    Args:
+        n_features (int): Hash buckets per vectorizer
+        alpha (float): L2 regularization strength
+        seed (int): Random seed for SGD
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, alpha: float = 1e-5, seed: int = 42):
+        self.vectorizer = FeatureUnion([
+            ("words", HashingVectorizer(ngram_range=(1, 2), n_features=n_features, alternate_sign=False)),
+            ("chars", HashingVectorizer(analyzer="char_wb", ngram_range=(3, 5), n_features=n_features,
+                                        alternate_sign=False)),
+        ])
+        self.model = SGDClassifier(loss="log_loss", alpha=alpha, max_iter=50, tol=1e-4, random_state=seed)
+        self.version: Optional[str] = None
+        self.metadata: Dict[str, Any] = {}
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str], sample_weight: Optional[np.ndarray] = None) -> "FastSentimentClassifier":
+        classes = sorted(set(labels))
+        if len(classes) < 2:
+            raise ValueError(
+                f"Teacher labels contain only one class ({', '.join(classes) or 'none'}); "
+                "the fast classifier needs at least two. Train on more varied headlines or check the teacher model."
+            )
+        self.model.fit(self.vectorizer.transform(texts), labels, sample_weight=sample_weight)
+        return self
+
+    def predict(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict labels for a batch of texts.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Predicted label and its probability for every text
+        """
+        probabilities = self.model.predict_proba(self.vectorizer.transform(texts))
+        best = probabilities.argmax(axis=1)
+        return self.model.classes_[best], probabilities[np.arange(len(best)), best]
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        # Plain sklearn objects, so the file loads no matter which module saved it
+        joblib.dump({
+            "vectorizer": self.vectorizer,
+            "model": self.model,
+            "version": self.version,
+            "metadata": self.metadata
+        }, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "FastSentimentClassifier":
+        state = joblib.load(path)
+        classifier = cls.__new__(cls)
+        classifier.vectorizer = state["vectorizer"]
+        classifier.model = state["model"]
+        classifier.version = state["version"]
+        classifier.metadata = state["metadata"]
+        return classifier
+
+def threshold_report(
+    fast_labels: np.ndarray,
+    fast_confidences: np.ndarray,
+    teacher_labels: np.ndarray,
+    thresholds: Sequence[float],
+    fast_seconds: float,
+    full_seconds: float
+) -> List[Dict[str, float]]:
+    """
+    Escalation rate, agreement and relative cost of the cascade at each threshold.
+
+    Args:
+        fast_labels (np.ndarray): Fast classifier predictions
+        fast_confidences (np.ndarray): Fast classifier probabilities
+        teacher_labels (np.ndarray): Transformer predictions for the same texts
+        thresholds (Sequence[float]): Confidence thresholds to evaluate
+        fast_seconds (float): Fast classifier cost per text
+        full_seconds (float): Transformer cost per text
+
+    Returns:
+        List[Dict[str, float]]: One row per threshold
+    """
+    agrees = fast_labels == teacher_labels
+    report = []
+    for threshold in thresholds:
+        accepted = fast_confidences >= threshold
+        escalation_rate = 1.0 - float(accepted.mean())
+        # Escalated texts get the transformer's label, so they always agree
+        cascade_agreement = float(np.where(accepted, agrees, True).mean())
+        cost = fast_seconds + escalation_rate * full_seconds
+        report.append({
+            "threshold": float(threshold),
+            "escalation_rate": escalation_rate,
+            "agreement": cascade_agreement,
+            "accepted_agreement": float(agrees[accepted].mean()) if accepted.any() else None,
+            "relative_cost": cost / full_seconds if full_seconds else None
+        })
+    return report
+
+def load_stored_headlines(limit: int) -> List[str]:
+    """Most recent distinct canonical headlines."""
+    from app.database.database import SessionLocal
+    from app.database.models import NewsArticle
+
+    with SessionLocal() as db:
+        rows = (
+            db.query(NewsArticle.headline)
+            .filter(NewsArticle.canonical_id.is_(None), NewsArticle.headline.isnot(None))
+            .order_by(NewsArticle.published_at.desc())
+            .limit(limit)
+            .all()
+        )
+    return list(dict.fromkeys(headline for headline, in rows if headline.strip()))
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Distill the transformer into the fast cascade classifier")
+    parser.add_argument("--limit", type=int, default=50000, help="Stored headlines to train on")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--alpha", type=float, default=1e-5)
+    parser.add_argument("--batch-size", type=int, default=64, help="Transformer batch size while labeling")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.85, 0.9, 0.95])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=settings.FAST_CLASSIFIER_PATH)
+    return parser.parse_args()
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args()
+    from app.ml.sentiment_analyzer import sentiment_analyzer
+
+    texts = load_stored_headlines(args.limit)
+    if len(texts) < 50:
+        raise SystemExit(f"Need at least 50 stored headlines, found {len(texts)}")
+    train_texts, test_texts = train_test_split(texts, test_size=args.test_size, random_state=args.seed)
+
+    # The transformer's predictions are the training targets
+    logger.info(f"Labeling {len(texts)} headlines with {sentiment_analyzer.model_version}")
+    start = time.perf_counter()
+    teacher = sentiment_analyzer.analyze_batch(train_texts, batch_size=args.batch_size, cascade=False)
+    teacher_test = sentiment_analyzer.analyze_batch(test_texts, batch_size=args.batch_size, cascade=False)
+    full_seconds = (time.perf_counter() - start) / len(texts)
+
+    classifier = FastSentimentClassifier(alpha=args.alpha, seed=args.seed)
+    try:
+        classifier.fit(
+            train_texts,
+            [result["label"] for result in teacher],
+            sample_weight=np.array([result["confidence"] for result in teacher])
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    start = time.perf_counter()
+    fast_labels, fast_confidences = classifier.predict(test_texts)
+    fast_seconds = (time.perf_counter() - start) / len(test_texts)
+    teacher_labels = np.array([result["label"] for result in teacher_test])
+    report = threshold_report(fast_labels, fast_confidences, teacher_labels, args.thresholds, fast_seconds, full_seconds)
+
+    classifier.version = f"fast_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    classifier.metadata = {
+        "version": classifier.version,
+        "created_at": datetime.now().isoformat(),
+        "teacher": sentiment_analyzer.model_version,
+        "train_examples": len(train_texts),
+        "test_examples": len(test_texts),
+        "fast_ms_per_text": fast_seconds * 1000,
+        "full_ms_per_text": full_seconds * 1000,
+        "thresholds": report
+    }
+    classifier.save(args.output)
+
+    logger.info(f"Fast classifier: {fast_seconds * 1000:.3f} ms/text, transformer: {full_seconds * 1000:.3f} ms/text")
+    for row in report:
+        logger.info(
+            f"threshold {row['threshold']:.2f}: escalation {row['escalation_rate']:.1%}, "
+            f"agreement {row['agreement']:.1%}, relative cost {row['relative_cost']:.2f}"
+        )
+    logger.info(f"Saved {classifier.version} to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,230 @@
-import psycopg2
-from psycopg2.extras import DictCursor
-from dotenv import load_dotenv
+import argparse
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from psycopg2.extras import DictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from app.ml.model_registry import HUMAN_LABEL
+from app.ml.sentiment_series import signed_score
+
+LABELS = ['positive', 'negative', 'neutral']
 
-def get_db_connection():
+def create_connection_pool(maxconn: int = 2) -> ThreadedConnectionPool:
+    """One connection for prefetching the next batch and one for writing labels."""
     load_dotenv()
-    return psycopg2.connect(os.getenv('DATABASE_URL'))
+    return ThreadedConnectionPool(1, maxconn, os.getenv('DATABASE_URL'))
+
+@contextmanager
+def pooled_connection(pool: ThreadedConnectionPool):
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+def get_unlabeled_articles(pool: ThreadedConnectionPool, limit: int = 50, after: Optional[Tuple[float, int]] = None):
+    """
+    Fetch articles without a human label, least confident model prediction first.
+
+    Every ingested article has a model prediction, so only human labels mark
+    an article as labeled. The confidence is that of the latest stored model
+    prediction; articles without one sort first.
+
+    Args:
+        pool (ThreadedConnectionPool): Database connection pool
+        limit (int): Maximum number of articles to return
+        after (Optional[Tuple[float, int]]): Only return articles after this
+            (confidence, id) key, so consecutive batches never overlap
 
-def get_unlabeled_articles(limit=10):
-    with get_db_connection() as conn:
+    Returns:
+        List[DictRow]: Articles with id, headline, content, published_at and confidence
+    """
+    keyset = "WHERE (confidence, id) > (%s, %s)" if after else ""
+    with pooled_connection(pool) as conn:
         with conn.cursor(cursor_factory=DictCursor) as cur:
-            cur.execute("""
-                SELECT id, headline, content, published_at 
-                FROM news_articles 
-                WHERE id NOT IN (SELECT article_id FROM sentiment_analysis)
-                ORDER BY published_at DESC
+            cur.execute(f"""
+                SELECT id, headline, content, published_at, confidence
+                FROM (
+                    SELECT a.id, a.headline, a.content, a.published_at, COALESCE((
+                        SELECT s.confidence FROM sentiment_analysis s
+                        WHERE s.article_id = a.id AND s.model_version IS DISTINCT FROM %s
+                        ORDER BY s.created_at DESC, s.id DESC
+                        LIMIT 1
+                    ), 0) AS confidence
+                    FROM news_articles a
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM sentiment_analysis s WHERE s.article_id = a.id AND s.model_version = %s
+                    )
+                ) unlabeled
+                {keyset}
+                ORDER BY confidence, id
                 LIMIT %s
-            """, (limit,))
-            return cur.fetchall()
+            """, (HUMAN_LABEL, HUMAN_LABEL, *(after or ()), limit))
+            articles = cur.fetchall()
+        conn.rollback()
+    return articles
 
-def label_article(article_id, label, score, confidence):
-    with get_db_connection() as conn:
+def save_labels(pool: ThreadedConnectionPool, labels: List[Tuple[int, str, float, float]]) -> None:
+    """Insert (article_id, label, score, confidence) rows in a single statement."""
+    if not labels:
+        return
+    created_at = datetime.utcnow()
+    with pooled_connection(pool) as conn:
         with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO sentiment_analysis 
-                (article_id, label, score, confidence, created_at)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (article_id, label, score, confidence, datetime.utcnow()))
-            conn.commit()
+            execute_values(cur, """
+                INSERT INTO sentiment_analysis
+                (article_id, label, score, confidence, model_version, created_at)
+                VALUES %s
+            """, [(*label, HUMAN_LABEL, created_at) for label in labels])
+        conn.commit()
 
-def main():
-    while True:
-        print("\n=== Financial News Labeling Tool ===")
-        articles = get_unlabeled_articles()
-        
+def suggest_labels(articles) -> List[Dict[str, Any]]:
+    """Predict a label for every article with one batched model call."""
+    from app.ml.sentiment_analyzer import sentiment_analyzer
+
+    texts = [f"{article['headline']} {article['content'] or ''}".strip() for article in articles]
+    suggestions = sentiment_analyzer.analyze_batch(texts)
+    for suggestion in suggestions:
+        suggestion['signed_score'] = signed_score(suggestion['label'], suggestion['score'])
+    return suggestions
+
+class LabelingSession:
+    """
+    Serves unlabeled articles with model suggestions while the labeler works.
+
+    The next batch is fetched and scored on a background thread as soon as the
+    current one is handed out, and finished labels are written in buffered
+    batches on another, so the prompt never waits on the database or the model.
+    Articles are served in order of the stored model confidence, least
+    confident first across all batches, since those are the labels the model
+    learns the most from.
+
+    Args:
+        pool (ThreadedConnectionPool): Database connection pool
+        batch_size (int): Articles fetched and scored per batch
+        flush_every (int): Labels buffered before they are written
+    """
+
+    def __init__(self, pool: ThreadedConnectionPool, batch_size: int = 50, flush_every: int = 20):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_every = flush_every
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="labeling")
+        self._cursor: Optional[Tuple[float, int]] = None
+        self._next_batch: Future = self._executor.submit(self._load_batch)
+        self._pending: List[Tuple[int, str, float, float]] = []
+        self._writes: List[Future] = []
+
+    def _load_batch(self) -> List[Tuple[Any, Dict[str, Any]]]:
+        articles = get_unlabeled_articles(self.pool, self.batch_size, self._cursor)
         if not articles:
-            print("No more articles to label!")
-            break
-            
-        for article in articles:
-            print(f"\nArticle ID: {article['id']}")
-            print(f"Headline: {article['headline']}")
-            print(f"Content: {article['content'][:200]}...")
-            print(f"Published: {article['published_at']}")
-            
-            while True:
-                label = input("\nEnter label (positive/negative/neutral) or 'skip': ").lower()
-                if label in ['positive', 'negative', 'neutral', 'skip']:
-                    break
-                print("Invalid label! Please enter positive, negative, neutral, or skip")
-            
-            if label == 'skip':
-                continue
-                
-            while True:
-                try:
-                    score = float(input("Enter sentiment score (-1 to 1): "))
-                    if -1 <= score <= 1:
-                        break
-                    print("Score must be between -1 and 1")
-                except ValueError:
-                    print("Please enter a valid number")
-            
-            while True:
-                try:
-                    confidence = float(input("Enter confidence score (0 to 1): "))
-                    if 0 <= confidence <= 1:
-                        break
-                    print("Confidence must be between 0 and 1")
-                except ValueError:
-                    print("Please enter a valid number")
-            
-            label_article(article['id'], label, score, confidence)
-            print("Article labeled successfully!")
-            
-        if input("\nContinue labeling? (y/n): ").lower() != 'y':
-            break
+            return []
+        last = articles[-1]
+        self._cursor = (last['confidence'], last['id'])
+        return list(zip(articles, suggest_labels(articles)))
+
+    def next_batch(self) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Return the prefetched batch and start loading the one after it."""
+        batch = self._next_batch.result()
+        if batch:
+            self._next_batch = self._executor.submit(self._load_batch)
+        return batch
+
+    def add_label(self, article_id: int, label: str, score: float, confidence: float) -> None:
+        self._pending.append((article_id, label, score, confidence))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered labels in the background."""
+        if self._pending:
+            labels, self._pending = self._pending, []
+            self._writes.append(self._executor.submit(save_labels, self.pool, labels))
+        self._raise_failed_writes()
+
+    def _raise_failed_writes(self) -> None:
+        for write in [write for write in self._writes if write.done()]:
+            self._writes.remove(write)
+            write.result()
+
+    def close(self) -> None:
+        """Write remaining labels and wait for background work to finish."""
+        self.flush()
+        self._next_batch.cancel()
+        self._executor.shutdown(wait=True)
+        self._raise_failed_writes()
+
+def prompt_label(suggestion: Dict[str, Any]) -> str:
+    while True:
+        label = input(f"\nEnter label (positive/negative/neutral) or 'skip' [{suggestion['label']}]: ").lower().strip()
+        if not label:
+            return suggestion['label']
+        if label in LABELS + ['skip']:
+            return label
+        print("Invalid label! Please enter positive, negative, neutral, or skip")
+
+def prompt_number(message: str, default: float, low: float, high: float) -> float:
+    while True:
+        value = input(f"{message} [{default:.2f}]: ").strip()
+        try:
+            number = float(value) if value else default
+            if low <= number <= high:
+                return number
+            print(f"Value must be between {low:g} and {high:g}")
+        except ValueError:
+            print("Please enter a valid number")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Label financial news sentiment")
+    parser.add_argument("--batch-size", type=int, default=50, help="Articles fetched and scored per batch")
+    parser.add_argument("--flush-every", type=int, default=20, help="Labels buffered before writing to the database")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    pool = create_connection_pool()
+    session = LabelingSession(pool, batch_size=args.batch_size, flush_every=args.flush_every)
+    labeled = 0
+    try:
+        while True:
+            print("\n=== Financial News Labeling Tool ===")
+            batch = session.next_batch()
+
+            if not batch:
+                print("No more articles to label!")
+                break
+
+            for article, suggestion in batch:
+                print(f"\nArticle ID: {article['id']}")
+                print(f"Headline: {article['headline']}")
+                print(f"Content: {(article['content'] or '')[:200]}...")
+                print(f"Published: {article['published_at']}")
+                print(f"Model suggestion: {suggestion['label']} (confidence {suggestion['confidence']:.2f})")
+
+                label = prompt_label(suggestion)
+                if label == 'skip':
+                    continue
+
+                default_score = suggestion['signed_score'] if label == suggestion['label'] else signed_score(label, 1.0)
+                score = prompt_number("Enter sentiment score (-1 to 1)", default_score, -1, 1)
+                confidence = prompt_number("Enter confidence score (0 to 1)", 1.0, 0, 1)
+
+                session.add_label(article['id'], label, score, confidence)
+                labeled += 1
+                print("Article labeled!")
+
+            session.flush()
+            if input("\nContinue labeling? (y/n): ").lower() != 'y':
+                break
+    finally:
+        session.close()
+        pool.closeall()
+        print(f"Saved {labeled} labels.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,127 @@
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+# model_version recorded on sentiment rows entered by human labelers
+HUMAN_LABEL = "human"
+
+ACTIVE_FILE = "ACTIVE"
+METADATA_FILE = "metadata.json"
+
+def file_marker(path: str) -> Optional[Tuple[int, int]]:
+    """
+    Cheap fingerprint of a file that changes whenever it is replaced.
+
+    Files written to a temporary path and renamed into place get a new inode
+    and modification time even when their content is the same.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+class ModelRegistry:
+    """
+    Local registry of versioned sentiment models.
+
+    Every version is a directory holding a Hugging Face model and tokenizer
+    saved with save_pretrained plus a metadata.json with its training
+    parameters and evaluation metrics. The ACTIVE file names the version the
+    API should serve; it is replaced atomically so a running process never
+    reads a half-written value.
+
+    Args:
+        root (str): Directory holding the registered versions
+    """
+
+    def __init__(self, root: str = settings.MODEL_REGISTRY_DIR):
+        self.root = root
+
+    def path(self, version: str) -> str:
+        if not re.fullmatch(r"[A-Za-z0-9._-]+", version):
+            raise ValueError(f"Invalid model version '{version}'")
+        return os.path.join(self.root, version)
+
+    def new_version(self, prefix: str = "v") -> str:
+        """Generate a version name that sorts by creation time."""
+        version = f"{prefix}{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        suffix = 1
+        while os.path.exists(self.path(version)):
+            suffix += 1
+            version = f"{prefix}{datetime.now().strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        return version
+
+    def register(self, model: Any, tokenizer: Any, metadata: Dict[str, Any], version: Optional[str] = None) -> str:
+        """
+        Save a trained model as a new version.
+
+        The version is written to a temporary directory and renamed into place,
+        so it only becomes visible once complete.
+
+        Args:
+            model: Hugging Face model to save
+            tokenizer: Tokenizer to save alongside the model
+            metadata (Dict[str, Any]): Training parameters and evaluation metrics
+            version (Optional[str]): Version name (generated if omitted)
+
+        Returns:
+            str: The registered version
+        """
+        version = version or self.new_version()
+        target = self.path(version)
+        if os.path.exists(target):
+            raise ValueError(f"Model version '{version}' already exists")
+        os.makedirs(self.root, exist_ok=True)
+
+        tmp_dir = target + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        model.save_pretrained(tmp_dir)
+        tokenizer.save_pretrained(tmp_dir)
+        with open(os.path.join(tmp_dir, METADATA_FILE), "w") as f:
+            json.dump({"version": version, "created_at": datetime.now().isoformat(), **metadata}, f, indent=2)
+        os.replace(tmp_dir, target)
+        return version
+
+    def versions(self) -> List[str]:
+        """Registered versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.endswith(".tmp") and os.path.isfile(os.path.join(self.root, name, METADATA_FILE))
+        )
+
+    def metadata(self, version: str) -> Dict[str, Any]:
+        with open(os.path.join(self.path(version), METADATA_FILE)) as f:
+            return json.load(f)
+
+    def active_version(self) -> Optional[str]:
+        """The version marked active, or None to serve the base checkpoint."""
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def active_marker(self) -> Optional[Tuple[int, int]]:
+        """Fingerprint of the ACTIVE file that changes whenever a version is activated."""
+        return file_marker(os.path.join(self.root, ACTIVE_FILE))
+
+    def activate(self, version: str) -> None:
+        """Mark a registered version as the one to serve."""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version '{version}'")
+        tmp_path = os.path.join(self.root, ACTIVE_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root, ACTIVE_FILE))
+
+# Create a singleton instance
+model_registry = ModelRegistry()
@@ -0,0 +1,180 @@
+import re
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Mersenne prime used by the MinHash permutations
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+class NearDuplicateDetector:
+    """
+    Detect near-duplicate headlines with MinHash signatures and an LSH index.
+
+    Headlines are normalized and split into word shingles, each shingle is
+    hashed once, and the signature is the minimum of every permutation applied
+    to those hashes. Signatures are split into bands; headlines sharing any band
+    are candidates and are confirmed by their estimated Jaccard similarity.
+    Word bigrams keep headlines that differ in a single word, such as "rise"
+    and "fall", well below the default threshold.
+
+    Args:
+        num_perm (int): Number of MinHash permutations (signature length)
+        bands (int): Number of LSH bands, must divide num_perm
+        threshold (float): Minimum estimated Jaccard similarity for a duplicate
+        shingle_size (int): Number of words per shingle
+        max_entries (int): Maximum number of headlines kept in the index
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.9,
+        shingle_size: int = 2,
+        max_entries: int = 50000,
+        seed: int = 42
+    ):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=(num_perm, 1), dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=(num_perm, 1), dtype=np.int64).astype(np.uint64)
+
+        self._entries: "OrderedDict[str, Tuple[Optional[np.ndarray], Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _shingles(self, text: str) -> List[str]:
+        """Split a normalized headline into overlapping word shingles."""
+        words = re.sub(r"[^a-z0-9 ]+", " ", text.lower()).split()
+        if not words:
+            return []
+        if len(words) <= self.shingle_size:
+            return [" ".join(words)]
+        return [" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a headline.
+
+        Args:
+            text (str): Headline text
+
+        Returns:
+            Optional[np.ndarray]: uint32 signature of length num_perm, None for headlines
+                without letters or digits (empty or symbols only)
+        """
+        shingles = set(self._shingles(text))
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64
+        )
+        permuted = (self._a * hashes[np.newaxis, :] + self._b) % _PRIME & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def find(self, text: str) -> Optional[Tuple[str, Any]]:
+        """
+        Find an indexed headline that is a near duplicate of the given text.
+
+        Args:
+            text (str): Headline text
+
+        Returns:
+            Optional[Tuple[str, Any]]: Key and value of the most similar match, if any
+        """
+        signature = self.signature(text)
+        # Headlines without text would all share one signature
+        if signature is None:
+            return None
+        return self._find_signature(signature)
+
+    def _find_signature(self, signature: np.ndarray) -> Optional[Tuple[str, Any]]:
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best_key, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = float(np.mean(self._entries[key][0] == signature))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+
+        if best_key is None:
+            return None
+        return best_key, self._entries[best_key][1]
+
+    def add(self, key: str, text: str, value: Any = None) -> None:
+        """
+        Index a headline under a key, evicting the oldest entry when full.
+
+        Args:
+            key (str): Unique key of the headline (e.g. the article URL)
+            text (str): Headline text
+            value (Any): Payload returned by find() for this headline
+        """
+        if key in self._entries:
+            self._entries[key] = (self._entries[key][0], value)
+            return
+
+        signature = self.signature(text)
+        self._entries[key] = (signature, value)
+        # Keep the payload of headlines without text but never offer them as a match
+        if signature is not None:
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, []).append(key)
+
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+
+    def get(self, key: str) -> Any:
+        """Return the payload stored for an indexed key."""
+        return self._entries[key][1]
+
+    def set_value(self, key: str, value: Any) -> None:
+        """Replace the payload stored for an indexed key."""
+        signature, _ = self._entries[key]
+        self._entries[key] = (signature, value)
+
+    def discard(self, key: str) -> None:
+        """Remove a key from the index if it is present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._remove_from_buckets(key, entry[0])
+
+    def _evict_oldest(self) -> None:
+        key, (signature, _) = self._entries.popitem(last=False)
+        self._remove_from_buckets(key, signature)
+
+    def _remove_from_buckets(self, key: str, signature: Optional[np.ndarray]) -> None:
+        if signature is None:
+            return
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is None:
+                continue
+            bucket.remove(key)
+            if not bucket:
+                del self._buckets[band_key]
@@ -1,26 +1,228 @@
-from transformers import pipeline, AutoModelForSequenceClassification, AutoTokenizer
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
 import torch
-from typing import Dict, Any, List
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, NamedTuple, Optional
 import numpy as np
 
+from app.config import settings
+from app.ml.fast_classifier import FastSentimentClassifier
+from app.ml.model_registry import ModelRegistry, file_marker, model_registry
+from app.ml.shared_weights import load_shared_model
+from app.services.metrics import metrics
+
+# Map model labels to our format
+LABEL_MAPPING = {
+    'POS': 'positive',
+    'NEG': 'negative',
+    'NEU': 'neutral'
+}
+
+SENTIMENT_STAGE_SECONDS = metrics.histogram(
+    "sentiment_stage_duration_seconds", "Time spent per sentiment model stage", ("stage",)
+)
+SENTIMENT_BATCH_SIZE = metrics.histogram(
+    "sentiment_batch_size", "Number of texts per model forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+SENTIMENT_CASCADE = metrics.counter(
+    "sentiment_cascade_predictions_total", "Cascade predictions by path (fast or escalated)", ("path",)
+)
+SENTIMENT_CASCADE_AUDITS = metrics.counter(
+    "sentiment_cascade_audits_total", "Confident fast predictions rechecked by the transformer", ("result",)
+)
+
+class LoadedModel(NamedTuple):
+    version: str
+    source: str
+    tokenizer: Any
+    model: Any
+
 class SentimentAnalyzer:
-    def __init__(self):
-        # Load pre-trained model and tokenizer
-        self.model_name = "finiteautomata/bertweet-base-sentiment-analysis"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
-        
-        # Move model to GPU if available
+    def __init__(self, registry: ModelRegistry = model_registry):
+        self.registry = registry
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
-        
-        # Initialize pipeline
-        self.analyzer = pipeline(
-            "sentiment-analysis",
-            model=self.model,
-            tokenizer=self.tokenizer,
-            device=0 if torch.cuda.is_available() else -1
-        )
+        self._load_lock = threading.Lock()
+        # Serve the active registry version, falling back to the pre-trained checkpoint
+        self._active_marker = registry.active_marker()
+        self._next_sync = time.monotonic() + settings.MODEL_SYNC_INTERVAL_SECONDS
+        self.load(registry.active_version())
+
+        self.cascade_enabled = settings.CASCADE_ENABLED
+        self.cascade_threshold = settings.CASCADE_THRESHOLD
+        self.fast_classifier: Optional[FastSentimentClassifier] = None
+        self._fast_marker = None
+        self._audit_rng = np.random.default_rng()
+        # Settings changed at runtime override the environment
+        self._cascade_marker = file_marker(settings.CASCADE_CONFIG_PATH)
+        self._apply_cascade_config()
+        if self.cascade_enabled:
+            self.load_fast_classifier()
+
+    @property
+    def loaded(self) -> LoadedModel:
+        return self._loaded
+
+    @property
+    def model_version(self) -> str:
+        return self._loaded.version
+
+    @property
+    def model(self) -> Any:
+        return self._loaded.model
+
+    @property
+    def tokenizer(self) -> Any:
+        return self._loaded.tokenizer
+
+    def load(self, version: Optional[str] = None) -> str:
+        """
+        Load a registered model version and swap it in for new requests.
+
+        Predictions already running finish on the previous model, so the API
+        keeps serving while a new version loads.
+
+        Args:
+            version (Optional[str]): Registry version, or None for the pre-trained checkpoint
+
+        Returns:
+            str: The version now being served
+        """
+        with self._load_lock:
+            source = self.registry.path(version) if version else settings.SENTIMENT_MODEL_NAME
+            tokenizer = AutoTokenizer.from_pretrained(source)
+            if settings.SHARED_WEIGHTS and self.device.type == "cpu":
+                model = load_shared_model(source)
+            else:
+                model = AutoModelForSequenceClassification.from_pretrained(source)
+                model.to(self.device)
+            model.eval()
+            self._loaded = LoadedModel(version or f"base:{settings.SENTIMENT_MODEL_NAME}", source, tokenizer, model)
+            return self._loaded.version
+
+    def reload(self) -> str:
+        """Switch to the registry's active version if it is not the one being served."""
+        version = self.registry.active_version()
+        if version is not None and version != self.model_version:
+            return self.load(version)
+        return self.model_version
+
+    def sync(self) -> None:
+        """
+        Pick up changes made by other worker processes.
+
+        Activating or reloading a version through the API only swaps the model
+        in the worker handling that request. Every worker therefore checks the
+        registry's ACTIVE marker, the saved cascade config and the fast
+        classifier file, at most once per MODEL_SYNC_INTERVAL_SECONDS, and
+        applies whichever of them changed.
+        """
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        self._next_sync = now + settings.MODEL_SYNC_INTERVAL_SECONDS
+
+        marker = self.registry.active_marker()
+        if marker != self._active_marker:
+            self._active_marker = marker
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Error loading the active model version: {str(e)}")
+
+        marker = file_marker(settings.CASCADE_CONFIG_PATH)
+        if marker != self._cascade_marker:
+            self._cascade_marker = marker
+            self._apply_cascade_config()
+        # A retrained fast classifier replaces its file
+        if self.cascade_enabled and file_marker(settings.FAST_CLASSIFIER_PATH) != self._fast_marker:
+            try:
+                self.load_fast_classifier()
+            except Exception as e:
+                print(f"Error loading the fast classifier: {str(e)}")
+
+    def configure_cascade(self, enabled: Optional[bool] = None, threshold: Optional[float] = None,
+                          reload: bool = False) -> None:
+        """
+        Change the cascade for every worker.
+
+        The settings are applied here and saved to CASCADE_CONFIG_PATH, which
+        the other workers re-read on their next sync.
+
+        Args:
+            enabled (Optional[bool]): Turn cascade scoring on or off
+            threshold (Optional[float]): Fast classifier confidence needed to skip the transformer
+            reload (bool): Reload the fast classifier from disk
+        """
+        if reload or (enabled and self.fast_classifier is None):
+            self.load_fast_classifier()
+        if enabled is not None:
+            self.cascade_enabled = enabled
+        if threshold is not None:
+            self.cascade_threshold = threshold
+
+        path = settings.CASCADE_CONFIG_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"enabled": self.cascade_enabled, "threshold": self.cascade_threshold}, f)
+        os.replace(tmp_path, path)
+        self._cascade_marker = file_marker(path)
+
+    def _apply_cascade_config(self) -> None:
+        """Apply the cascade settings saved by configure_cascade, if any."""
+        try:
+            with open(settings.CASCADE_CONFIG_PATH) as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Error reading cascade config: {str(e)}")
+            return
+        self.cascade_enabled = bool(config.get("enabled", self.cascade_enabled))
+        self.cascade_threshold = float(config.get("threshold", self.cascade_threshold))
+
+    def load_fast_classifier(self, path: Optional[str] = None) -> Optional[str]:
+        """
+        Load the fast first-pass classifier used in cascade mode.
+
+        Args:
+            path (Optional[str]): Classifier file (defaults to FAST_CLASSIFIER_PATH)
+
+        Returns:
+            Optional[str]: Version of the loaded classifier, or None if there is none yet
+        """
+        path = path or settings.FAST_CLASSIFIER_PATH
+        self._fast_marker = file_marker(path)
+        if not os.path.exists(path):
+            print(f"No fast classifier at {path}; scoring everything with the transformer")
+            self.fast_classifier = None
+            return None
+        self.fast_classifier = FastSentimentClassifier.load(path)
+        return self.fast_classifier.version
+
+    def cascade_stats(self) -> Dict[str, Any]:
+        """Escalation rate and agreement of the cascade since the process started."""
+        fast_count = SENTIMENT_CASCADE.value(path="fast")
+        escalated_count = SENTIMENT_CASCADE.value(path="escalated")
+        agree = SENTIMENT_CASCADE_AUDITS.value(result="agree")
+        disagree = SENTIMENT_CASCADE_AUDITS.value(result="disagree")
+        fast = self.fast_classifier
+        return {
+            "enabled": self.cascade_enabled and fast is not None,
+            "threshold": self.cascade_threshold,
+            "audit_rate": settings.CASCADE_AUDIT_RATE,
+            "fast_classifier": None if fast is None else fast.version,
+            "teacher": None if fast is None else fast.metadata.get("teacher"),
+            "predictions": {"fast": int(fast_count), "escalated": int(escalated_count)},
+            "escalation_rate": escalated_count / (fast_count + escalated_count) if fast_count + escalated_count else None,
+            "audits": {"agree": int(agree), "disagree": int(disagree)},
+            "agreement": agree / (agree + disagree) if agree + disagree else None,
+            # Offline escalation/agreement trade-off measured when the classifier was trained
+            "offline": None if fast is None else fast.metadata.get("thresholds")
+        }
 
     def analyze_text(self, text: str) -> Dict[str, Any]:
         """
@@ -34,20 +236,7 @@ class SentimentAnalyzer:
         """
         try:
             # Get sentiment prediction
-            result = self.analyzer(text)[0]
-            
-            # Map labels to our format
-            label_mapping = {
-                'POS': 'positive',
-                'NEG': 'negative',
-                'NEU': 'neutral'
-            }
-            
-            return {
-                "label": label_mapping.get(result['label'], 'neutral'),
-                "score": result['score'],
-                "confidence": result['score']
-            }
+            return self._score([text], batch_size=1)[0]
             
         except Exception as e:
             print(f"Error in sentiment analysis: {str(e)}")
@@ -57,22 +246,83 @@ class SentimentAnalyzer:
                 "confidence": 0.0
             }
 
-    def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def analyze_batch(self, texts: List[str], batch_size: int = 32, cascade: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         Analyze sentiment of multiple texts.
         
         Args:
             texts (List[str]): List of texts to analyze
+            batch_size (int): Number of texts per forward pass
+            cascade (Optional[bool]): Score with the fast classifier first (defaults to the CASCADE_ENABLED setting)
             
         Returns:
             List[Dict[str, Any]]: List of sentiment analysis results
         """
+        if not texts:
+            return []
         try:
-            results = self.analyzer(texts)
-            return [self.analyze_text(text) for text in texts]
+            return self._score(list(texts), batch_size, cascade)
         except Exception as e:
             print(f"Error in batch sentiment analysis: {str(e)}")
             return [{"label": "neutral", "score": 0.0, "confidence": 0.0} for _ in texts]
 
+    def _score(self, texts: List[str], batch_size: int, cascade: Optional[bool] = None) -> List[Dict[str, Any]]:
+        self.sync()
+        fast = self.fast_classifier
+        if (self.cascade_enabled if cascade is None else cascade) and fast is not None:
+            return self._cascade(texts, batch_size, fast)
+        return self._predict_batches(texts, batch_size)
+
+    def _predict_batches(self, texts: List[str], batch_size: int) -> List[Dict[str, Any]]:
+        results = []
+        for start in range(0, len(texts), batch_size):
+            results.extend(self._predict(texts[start:start + batch_size]))
+        return results
+
+    def _cascade(self, texts: List[str], batch_size: int, fast: FastSentimentClassifier) -> List[Dict[str, Any]]:
+        """Score with the fast classifier and escalate low-confidence texts to the transformer."""
+        with SENTIMENT_STAGE_SECONDS.time(stage="fast"):
+            labels, confidences = fast.predict(texts)
+        accepted = confidences >= self.cascade_threshold
+        # Recheck a small sample of confident predictions to keep measuring agreement
+        audited = accepted & (self._audit_rng.random(len(texts)) < settings.CASCADE_AUDIT_RATE)
+        SENTIMENT_CASCADE.inc(int(accepted.sum()), path="fast")
+        SENTIMENT_CASCADE.inc(int((~accepted).sum()), path="escalated")
+
+        results = [
+            {"label": str(label), "score": float(confidence), "confidence": float(confidence), "model_version": fast.version}
+            for label, confidence in zip(labels, confidences)
+        ]
+        escalate = np.flatnonzero(~accepted | audited)
+        for index, result in zip(escalate, self._predict_batches([texts[i] for i in escalate], batch_size)):
+            if audited[index]:
+                SENTIMENT_CASCADE_AUDITS.inc(result="agree" if result["label"] == labels[index] else "disagree")
+            results[index] = result
+        return results
+
+    def _predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Run one forward pass over a batch of texts."""
+        # Read the model once so a concurrent hot-swap cannot mix two versions
+        loaded = self._loaded
+        SENTIMENT_BATCH_SIZE.observe(len(texts))
+        with SENTIMENT_STAGE_SECONDS.time(stage="tokenize"):
+            inputs = loaded.tokenizer(texts, padding=True, truncation=True, return_tensors="pt").to(self.device)
+        with SENTIMENT_STAGE_SECONDS.time(stage="forward"), torch.no_grad():
+            probabilities = torch.softmax(loaded.model(**inputs).logits, dim=-1)
+        confidences, indices = probabilities.max(dim=-1)
+        return [
+            self._format_result(loaded.model.config.id2label[index], confidence, loaded.version)
+            for index, confidence in zip(indices.tolist(), confidences.tolist())
+        ]
+
+    def _format_result(self, label: str, score: float, model_version: str) -> Dict[str, Any]:
+        """Map a model prediction to our result format."""
+        return {
+            "label": LABEL_MAPPING.get(label, 'neutral'),
+            "score": score,
+            "confidence": score,
+            "model_version": model_version
+        }
+
 # Create singleton instance
 sentiment_analyzer = SentimentAnalyzer() 
\ No newline at end of file
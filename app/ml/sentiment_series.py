@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import or_, select, union
+from sqlalchemy.orm import Session
+
+from app.database.models import ArticleTicker, NewsArticle, SentimentAnalysis
+from app.ml.model_registry import HUMAN_LABEL
+
+LABELS = ("positive", "negative", "neutral")
+
+def signed_score(label: str, score: float) -> float:
+    """
+    Convert a label and its confidence into a score between -1 and 1.
+
+    Args:
+        label (str): Sentiment label (positive, negative or neutral)
+        score (float): Model probability for that label
+
+    Returns:
+        float: Positive scores for positive labels, negative for negative, 0 for neutral
+    """
+    if label == "positive":
+        return float(score)
+    if label == "negative":
+        return -float(score)
+    return 0.0
+
+def model_predictions():
+    """Filter clause selecting model predictions, leaving out human labels kept for training."""
+    return or_(SentimentAnalysis.model_version.is_(None), SentimentAnalysis.model_version != HUMAN_LABEL)
+
+def finite_or_none(value: float) -> Optional[float]:
+    """Convert NaN and infinite values to None so results serialize to JSON."""
+    return float(value) if np.isfinite(value) else None
+
+def summarize_sentiment(articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarize the sentiment of a list of analyzed articles.
+
+    Near-duplicates of another article are skipped so syndicated stories are
+    only counted once.
+
+    Args:
+        articles (List[Dict[str, Any]]): Articles as returned by NewsService
+
+    Returns:
+        Dict[str, Any]: Article count, mean signed score and label distribution
+    """
+    articles = [article for article in articles if not article.get("duplicate_of")]
+    counts = {label: 0 for label in LABELS}
+    total_score = 0.0
+    for article in articles:
+        sentiment = article["sentiment"]
+        label = sentiment["label"] if sentiment["label"] in counts else "neutral"
+        counts[label] += 1
+        total_score += signed_score(label, sentiment["score"])
+
+    article_count = len(articles)
+    return {
+        "article_count": article_count,
+        "mean_sentiment": total_score / article_count if article_count else 0.0,
+        "sentiment_distribution": {
+            label: (count / article_count if article_count else 0.0)
+            for label, count in counts.items()
+        }
+    }
+
+def load_sentiment_arrays(
+    db: Session,
+    tickers: Sequence[str],
+    since: Optional[datetime] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Load stored sentiment for several tickers with a single query.
+
+    An article counts for the ticker it was fetched for and for every ticker it
+    is tagged with, once each. Near-duplicates, human labels and rows stored
+    without a prediction are skipped.
+
+    Args:
+        db (Session): Database session
+        tickers (Sequence[str]): Ticker symbols to load
+        since (Optional[datetime]): Only include articles published after this time
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: Index into tickers, epoch seconds
+            and signed score of every article, ordered by publication time
+    """
+    mentions = union(
+        select(NewsArticle.id.label("article_id"), NewsArticle.ticker.label("ticker"))
+        .where(NewsArticle.ticker.in_(list(tickers))),
+        select(ArticleTicker.article_id, ArticleTicker.ticker)
+        .where(ArticleTicker.ticker.in_(list(tickers)))
+    ).subquery()
+    query = (
+        db.query(mentions.c.ticker, NewsArticle.published_at, SentimentAnalysis.label, SentimentAnalysis.score)
+        .join(NewsArticle, NewsArticle.id == mentions.c.article_id)
+        .join(SentimentAnalysis, SentimentAnalysis.article_id == NewsArticle.id)
+        .filter(
+            NewsArticle.canonical_id.is_(None),
+            SentimentAnalysis.confidence > 0,
+            model_predictions()
+        )
+    )
+    if since is not None:
+        query = query.filter(NewsArticle.published_at >= since)
+    rows = query.order_by(NewsArticle.published_at).all()
+
+    positions = {ticker: index for index, ticker in enumerate(tickers)}
+    ticker_index = np.fromiter((positions[row[0]] for row in rows), dtype=np.int32, count=len(rows))
+    timestamps = np.fromiter((int(row[1].timestamp()) for row in rows), dtype=np.int64, count=len(rows))
+    labels = np.array([row[2] for row in rows], dtype=object)
+    scores = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+    signed = np.where(labels == "positive", scores, np.where(labels == "negative", -scores, 0.0))
+    return ticker_index, timestamps, signed.astype(np.float64)
+
+def load_sentiment_series(
+    db: Session,
+    ticker: str,
+    since: Optional[datetime] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load the stored sentiment time series of one ticker.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Epoch seconds and signed score per article
+    """
+    _, timestamps, scores = load_sentiment_arrays(db, [ticker], since)
+    return timestamps, scores
@@ -0,0 +1,207 @@
+"""
+Load model weights from a memory-mapped safetensors file so that processes share them.
+
+Every Uvicorn worker normally holds its own copy of the model. When the
+weights are tensors over a file mapping instead, all workers read the same
+page-cache pages, and each worker's private memory shrinks to activations
+and Python objects.
+
+Usage:
+    python -m app.ml.shared_weights export
+    python -m app.ml.shared_weights report --match uvicorn
+"""
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+from typing import Any, Dict, List, Optional
+
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification
+from transformers.modeling_utils import no_init_weights
+
+from app.config import settings
+
+SAFETENSORS_FILE = "model.safetensors"
+SAFETENSORS_DTYPES = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8,
+    "U8": torch.uint8, "BOOL": torch.bool,
+}
+# /proc/<pid>/smaps_rollup fields included in the memory report, in kB
+MEMORY_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+def weights_path(source: str) -> str:
+    """
+    Safetensors file to map for a model source.
+
+    Registry versions already contain one from save_pretrained; Hub checkpoints
+    are exported once into SHARED_WEIGHTS_DIR.
+    """
+    local = os.path.join(source, SAFETENSORS_FILE)
+    if os.path.isfile(local):
+        return local
+    safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", source)
+    return os.path.join(settings.SHARED_WEIGHTS_DIR, f"{safe_name}.safetensors")
+
+def export_weights(model: Any, path: str) -> None:
+    """Write a model's weights to a safetensors file, atomically."""
+    from safetensors.torch import save_model
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Unique per process, since several workers may export at the same time
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    save_model(model, tmp_path)
+    os.replace(tmp_path, path)
+
+def mmap_state_dict(path: str) -> Dict[str, torch.Tensor]:
+    """
+    Map a safetensors file and return tensors backed directly by the mapping.
+
+    The mapping is private copy-on-write: pages stay shared through the page
+    cache as long as nothing writes to the weights, which inference never does.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    header_size = struct.unpack("<Q", buffer[:8])[0]
+    header = json.loads(buffer[8:8 + header_size])
+    data_start = 8 + header_size
+
+    state_dict = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = SAFETENSORS_DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        count = (end - begin) // dtype.itemsize
+        if count == 0:
+            state_dict[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        # The tensor holds a reference to the mapping, which stays open while any weight is alive
+        tensor = torch.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + begin)
+        state_dict[name] = tensor.view(info["shape"])
+    return state_dict
+
+def load_shared_model(source: str, path: Optional[str] = None) -> Any:
+    """
+    Build a sequence classification model whose weights live in a file mapping.
+
+    The model is constructed without initializing weights, then every
+    parameter is replaced by its memory-mapped tensor with
+    load_state_dict(assign=True), so no private copy of the weights is made.
+
+    Args:
+        source (str): Registry directory or Hub checkpoint name
+        path (str): Safetensors file (defaults to weights_path(source))
+
+    Returns:
+        The model in eval mode
+    """
+    path = path or weights_path(source)
+    if not os.path.exists(path):
+        export_weights(AutoModelForSequenceClassification.from_pretrained(source), path)
+
+    config = AutoConfig.from_pretrained(source)
+    with no_init_weights():
+        model = AutoModelForSequenceClassification.from_config(config)
+    missing, _ = model.load_state_dict(mmap_state_dict(path), strict=False, assign=True)
+    model.tie_weights()
+    # Keys saved once for tied parameters are filled in by tie_weights
+    missing = [name for name in missing if not _is_tied(model, name)]
+    if missing:
+        raise ValueError(f"{path} is missing weights: {', '.join(missing[:5])}")
+    model.eval()
+    return model
+
+def _is_tied(model: Any, name: str) -> bool:
+    patterns = getattr(model, "_tied_weights_keys", None) or []
+    return any(re.search(pattern, name) for pattern in patterns)
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """RSS, PSS and shared/private memory of a process in kB, read from /proc."""
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                field, _, value = line.partition(":")
+                if field in MEMORY_FIELDS:
+                    memory[field] = int(value.split()[0])
+    except FileNotFoundError:
+        # Kernels before 4.14 have no smaps_rollup; fall back to RSS alone
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    memory["Rss"] = int(line.split()[1])
+    return memory
+
+def find_processes(match: str) -> List[int]:
+    """Ids of processes whose command line contains match."""
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit() or int(entry) == os.getpid():
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ").decode(errors="ignore")
+        except OSError:
+            continue
+        if match in cmdline:
+            pids.append(int(entry))
+    return sorted(pids)
+
+def memory_report(pids: List[int]) -> Dict[str, Any]:
+    """
+    Per-process memory and totals for a group of workers.
+
+    PSS splits shared pages between the processes using them, so the PSS
+    total is the real footprint of the group, while the RSS total counts
+    shared weights once per worker.
+    """
+    processes = {}
+    for pid in pids:
+        try:
+            processes[pid] = process_memory(pid)
+        except OSError:
+            continue
+    totals = {field: sum(memory.get(field, 0) for memory in processes.values()) for field in MEMORY_FIELDS}
+    return {"processes": processes, "total_kb": totals}
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Shared model weights tooling")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="Export the served model to a safetensors file")
+    export.add_argument("--source", help="Registry directory or Hub checkpoint (defaults to the active model)")
+    report = subparsers.add_parser("report", help="Show RSS/PSS of running workers")
+    report.add_argument("--match", default="uvicorn", help="Substring of the worker command line")
+    report.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == "export":
+        from app.ml.model_registry import model_registry
+
+        version = model_registry.active_version()
+        source = args.source or (model_registry.path(version) if version else settings.SENTIMENT_MODEL_NAME)
+        path = weights_path(source)
+        export_weights(AutoModelForSequenceClassification.from_pretrained(source), path)
+        print(f"Exported {source} to {path}")
+        return
+
+    report = memory_report(find_processes(args.match))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'PID':>8} {'RSS MB':>10} {'PSS MB':>10} {'Shared MB':>10} {'Private MB':>11}")
+    for pid, memory in report["processes"].items():
+        shared = memory.get("Shared_Clean", 0) + memory.get("Shared_Dirty", 0)
+        private = memory.get("Private_Clean", 0) + memory.get("Private_Dirty", 0)
+        print(f"{pid:>8} {memory.get('Rss', 0) / 1024:>10.1f} {memory.get('Pss', 0) / 1024:>10.1f} "
+              f"{shared / 1024:>10.1f} {private / 1024:>11.1f}")
+    totals = report["total_kb"]
+    print(f"{'total':>8} {totals['Rss'] / 1024:>10.1f} {totals['Pss'] / 1024:>10.1f}")
+
+if __name__ == "__main__":
+    main()
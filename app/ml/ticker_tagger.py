@@ -0,0 +1,241 @@
+import json
+import os
+import re
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+SYMBOL = "symbol"
+NAME = "name"
+
+# Tickers that are also everyday words or acronyms; only a cashtag ($ON) counts for these
+AMBIGUOUS_SYMBOLS = frozenset({
+    "A", "AI", "ALL", "AM", "ARE", "BIG", "CAN", "CEO", "CFO", "CPI", "EV", "FED", "FOR", "GDP",
+    "GO", "HAS", "IPO", "IT", "KEY", "LOW", "NEW", "NOW", "ON", "ONE", "OPEN", "PM", "REAL",
+    "SEC", "SO", "TV", "US", "USA", "WELL",
+})
+# Legal suffixes stripped from Finnhub company descriptions ("APPLE INC" -> "apple")
+NAME_SUFFIX = re.compile(
+    r"(?:[\s,/&-]+(?:INC|CORP|CORPORATION|CO|COMPANY|LTD|LIMITED|PLC|HOLDINGS?|GROUP|SA|NV|AG|SE|LP|LLC"
+    r"|CLASS [A-Z]|CL [A-Z]|THE|ADR|SPONSORED ADR|REIT)\.?)+$"
+)
+# Symbols this short collide with initials, grades and model names ("U.S.", "Series C", "F-150")
+MAX_SHORT_SYMBOL_LENGTH = 2
+# Exchange prefix qualifying a bare symbol, as in "(NYSE: F)" or "NASDAQ:AB"
+EXCHANGE_PREFIX = re.compile(r"\b(?:NYSE(?: American| Arca)?|NASDAQ|Nasdaq|AMEX|NYSEAMERICAN|NYSEARCA)\s*:\s*$")
+EXCHANGE_PREFIX_WINDOW = 20
+# Short names that would match too much prose once stripped of their suffix
+MIN_NAME_LENGTH = 4
+MAX_TICKER_LENGTH = 10
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton matching many patterns in one pass over a text.
+
+    Matching is O(len(text) + matches) no matter how many patterns there are.
+
+    Args:
+        patterns (Iterable[str]): Patterns to match, in the case they will be searched
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        # Nearest state along the failure chain that ends a pattern
+        self._output_link: List[int] = [-1]
+        self.lengths: List[int] = []
+
+        for index, pattern in enumerate(patterns):
+            self._add(pattern, index)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def _add(self, pattern: str, index: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._output_link.append(-1)
+            state = next_state
+        self._output[state].append(index)
+        self.lengths.append(len(pattern))
+
+    def _build(self) -> None:
+        """Compute failure and output links breadth-first."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                fail = self._fail[child]
+                self._output_link[child] = fail if self._output[fail] else self._output_link[fail]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield every pattern occurrence in text.
+
+        Yields:
+            Tuple[int, int, int]: Start offset, end offset and pattern index
+        """
+        goto, fail, output, output_link, lengths = self._goto, self._fail, self._output, self._output_link, self.lengths
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            match_state = state if output[state] else output_link[state]
+            while match_state > 0:
+                for index in output[match_state]:
+                    yield position + 1 - lengths[index], position + 1, index
+                match_state = output_link[match_state]
+
+class TickerTagger:
+    """
+    Tag text with the tickers it mentions, by symbol or by company name.
+
+    One automaton holds every symbol and company name in lower case. Symbol
+    hits only count when written in upper case inside mixed-case text, or
+    when qualified as a cashtag ($F) or with an exchange prefix (NYSE: F);
+    symbols of up to two letters and ambiguous ones must be qualified. Name
+    hits must start with a capital. Both must sit on word boundaries, and
+    overlapping hits resolve to the leftmost longest.
+
+    Args:
+        companies (Dict[str, Sequence[str]]): Ticker symbol to company names and aliases
+        ambiguous_symbols (Iterable[str]): Symbols that only count as cashtags
+    """
+
+    def __init__(self, companies: Dict[str, Sequence[str]], ambiguous_symbols: Iterable[str] = AMBIGUOUS_SYMBOLS):
+        self.ambiguous_symbols = frozenset(ambiguous_symbols)
+        self._patterns: List[Tuple[str, str]] = []
+        keys = []
+        seen = set()
+        for symbol, names in companies.items():
+            for kind, pattern in [(SYMBOL, symbol)] + [(NAME, name) for name in names]:
+                key = pattern.lower()
+                if key and (key, symbol, kind) not in seen:
+                    seen.add((key, symbol, kind))
+                    keys.append(key)
+                    self._patterns.append((symbol, kind))
+        self._automaton = AhoCorasick(keys)
+        self.symbols = frozenset(companies)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def tag(self, text: str) -> List[str]:
+        """
+        Find the tickers mentioned in a text.
+
+        Args:
+            text (str): Headline or article body
+
+        Returns:
+            List[str]: Tickers in order of first mention
+        """
+        if not text:
+            return []
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lowercase to two; keep offsets aligned with the original
+            lowered = "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+        all_caps = text.isupper()
+
+        candidates = []
+        for start, end, index in self._automaton.iter_matches(lowered):
+            if (start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum()):
+                continue
+            symbol, kind = self._patterns[index]
+            original = text[start:end]
+            if kind == SYMBOL:
+                qualified = (start > 0 and text[start - 1] == "$") or (
+                    EXCHANGE_PREFIX.search(text, max(0, start - EXCHANGE_PREFIX_WINDOW), start) is not None
+                )
+                if not qualified and (
+                    all_caps or not original.isupper() or symbol in self.ambiguous_symbols
+                    or len(symbol) <= MAX_SHORT_SYMBOL_LENGTH
+                ):
+                    continue
+            elif not original[0].isupper():
+                continue
+            candidates.append((start, -(end - start), symbol))
+
+        tickers = []
+        covered_until = 0
+        for start, negative_length, symbol in sorted(candidates):
+            if start < covered_until:
+                continue
+            covered_until = start - negative_length
+            if symbol not in tickers:
+                tickers.append(symbol)
+        return tickers
+
+def normalize_company_name(description: str) -> Optional[str]:
+    """Strip legal suffixes from a company description; None if too short to match safely."""
+    name = NAME_SUFFIX.sub("", description.strip().upper()).strip(" ,.-/")
+    return name.lower() if len(name) >= MIN_NAME_LENGTH else None
+
+def build_dictionary(symbols: Iterable[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Build a ticker dictionary from Finnhub stock_symbols records.
+
+    Only common stock with plain symbols is kept.
+
+    Returns:
+        Dict[str, List[str]]: Ticker symbol to company names
+    """
+    dictionary = {}
+    for record in symbols:
+        symbol = record.get("symbol", "")
+        if record.get("type", "Common Stock") != "Common Stock":
+            continue
+        if not symbol or len(symbol) > MAX_TICKER_LENGTH or not re.fullmatch(r"[A-Z][A-Z0-9]*", symbol):
+            continue
+        name = normalize_company_name(record.get("description", ""))
+        dictionary[symbol] = [name] if name else []
+    return dictionary
+
+def load_ticker_tagger(
+    fetch_symbols: Optional[Callable[[], Iterable[Dict[str, Any]]]] = None,
+    path: str = settings.TICKER_DICTIONARY_PATH
+) -> TickerTagger:
+    """
+    Build a tagger from the ticker dictionary file, creating the file if needed.
+
+    The file maps each symbol to its company names and can be edited to add
+    aliases such as brand names.
+
+    Args:
+        fetch_symbols: Returns Finnhub stock_symbols records when the file does not exist yet
+        path (str): Dictionary JSON file
+
+    Returns:
+        TickerTagger: Tagger over the dictionary (empty if there is none)
+    """
+    if os.path.exists(path):
+        with open(path) as f:
+            return TickerTagger(json.load(f))
+    if fetch_symbols is None:
+        return TickerTagger({})
+
+    dictionary = build_dictionary(fetch_symbols())
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(dictionary, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, path)
+    return TickerTagger(dictionary)
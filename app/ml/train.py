@@ -0,0 +1,288 @@
+"""
+Fine-tune or distill the sentiment model on labeled news and register the result.
+
+Training data are the human labels stored in sentiment_analysis plus the
+collector's labeled_news_*.json files. A held-out split is used to compare
+the new model with the one currently served before it is written to the
+model registry.
+
+Usage:
+    python -m app.ml.train
+    python -m app.ml.train --mode distill --student prajjwal1/bert-tiny --activate
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+import torch
+import torch.nn.functional as F
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
+from sklearn.model_selection import train_test_split
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from app.database.database import SessionLocal
+from app.database.models import NewsArticle, SentimentAnalysis
+from app.ml.model_registry import HUMAN_LABEL, model_registry
+from app.ml.sentiment_analyzer import LABEL_MAPPING, sentiment_analyzer
+from app.ml.sentiment_series import LABELS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+# Model label names for each of our labels, e.g. 'positive' -> 'POS'
+MODEL_LABELS = {label: name for name, label in LABEL_MAPPING.items()}
+
+def load_human_labels() -> List[Tuple[str, str]]:
+    """Headlines labeled with the labeling tool."""
+    with SessionLocal() as db:
+        rows = (
+            db.query(NewsArticle.headline, SentimentAnalysis.label)
+            .join(SentimentAnalysis, SentimentAnalysis.article_id == NewsArticle.id)
+            .filter(SentimentAnalysis.model_version == HUMAN_LABEL)
+            .order_by(SentimentAnalysis.id)
+            .all()
+        )
+    return [(headline, label) for headline, label in rows if headline and label in LABELS]
+
+def load_labeled_files(data_dir: str = DATA_DIR) -> List[Tuple[str, str]]:
+    """Titles and labels from the collector's labeled_news_*.json and chunked labeled_news_*.jsonl files."""
+    examples = []
+    for path in sorted(glob.glob(os.path.join(data_dir, "labeled_news_*.json*"))):
+        with open(path) as f:
+            # Chunked collection appends one record per line
+            records = (json.loads(line) for line in f if line.strip()) if path.endswith(".jsonl") else json.load(f)
+            for record in records:
+                # The API scores headlines, so train on titles rather than title + description
+                text = record.get("title") or record.get("text")
+                if text and record.get("label") in LABELS:
+                    examples.append((text, record["label"]))
+    return examples
+
+def build_dataset(include_files: bool = True, data_dir: str = DATA_DIR) -> List[Tuple[str, str]]:
+    """Merge the label sources; human labels win when the same text appears twice."""
+    examples: Dict[str, str] = {}
+    if include_files:
+        examples.update(load_labeled_files(data_dir))
+    examples.update(load_human_labels())
+    return list(examples.items())
+
+def split_dataset(examples: List[Tuple[str, str]], test_size: float, seed: int):
+    labels = [label for _, label in examples]
+    counts = {label: labels.count(label) for label in set(labels)}
+    # Stratify only when every class can appear on both sides
+    stratify = labels if min(counts.values()) >= 2 else None
+    return train_test_split(examples, test_size=test_size, random_state=seed, stratify=stratify)
+
+def label_ids(model: Any) -> Dict[str, int]:
+    """Map our labels to the model's output indices."""
+    ids = {name: int(index) for index, name in model.config.id2label.items()}
+    return {label: ids[MODEL_LABELS[label]] for label in LABELS}
+
+def create_student(checkpoint: str) -> Tuple[Any, Any]:
+    """Load a smaller checkpoint with a fresh three-way head using the teacher's label names."""
+    id2label = {index: MODEL_LABELS[label] for index, label in enumerate(LABELS)}
+    model = AutoModelForSequenceClassification.from_pretrained(
+        checkpoint,
+        num_labels=len(LABELS),
+        id2label=id2label,
+        label2id={name: index for index, name in id2label.items()},
+        ignore_mismatched_sizes=True
+    )
+    return AutoTokenizer.from_pretrained(checkpoint), model
+
+def predict_logits(tokenizer: Any, model: Any, texts: List[str], batch_size: int, max_length: int) -> torch.Tensor:
+    model.eval()
+    device = next(model.parameters()).device
+    outputs = []
+    with torch.no_grad():
+        for start in range(0, len(texts), batch_size):
+            inputs = tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=max_length, return_tensors="pt"
+            ).to(device)
+            outputs.append(model(**inputs).logits.float().cpu())
+    return torch.cat(outputs) if outputs else torch.empty(0, len(LABELS))
+
+def train(
+    tokenizer: Any,
+    model: Any,
+    texts: List[str],
+    targets: List[int],
+    teacher_probs: Any = None,
+    epochs: int = 3,
+    batch_size: int = 16,
+    learning_rate: float = 2e-5,
+    max_length: int = 128,
+    alpha: float = 0.5,
+    temperature: float = 2.0,
+    seed: int = 42
+) -> List[float]:
+    """
+    Train on hard labels, optionally mixed with the teacher's soft labels.
+
+    With teacher_probs the loss is alpha * cross-entropy on the labels plus
+    (1 - alpha) * T^2 * KL divergence to the teacher at temperature T.
+
+    Returns:
+        List[float]: Mean training loss per epoch
+    """
+    device = next(model.parameters()).device
+    optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate)
+    targets_tensor = torch.tensor(targets)
+    rng = random.Random(seed)
+    order = list(range(len(texts)))
+    history = []
+
+    for epoch in range(epochs):
+        model.train()
+        rng.shuffle(order)
+        total, batches = 0.0, 0
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = tokenizer(
+                [texts[i] for i in batch], padding=True, truncation=True,
+                max_length=max_length, return_tensors="pt"
+            ).to(device)
+            logits = model(**inputs).logits
+            loss = F.cross_entropy(logits, targets_tensor[batch].to(device))
+            if teacher_probs is not None:
+                soft_targets = teacher_probs[batch].to(device)
+                distillation = F.kl_div(
+                    F.log_softmax(logits / temperature, dim=-1), soft_targets, reduction="batchmean"
+                ) * temperature ** 2
+                loss = alpha * loss + (1 - alpha) * distillation
+
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total += loss.item()
+            batches += 1
+        history.append(total / max(batches, 1))
+        logger.info(f"Epoch {epoch + 1}/{epochs}: loss {history[-1]:.4f}")
+    model.eval()
+    return history
+
+def evaluate(tokenizer: Any, model: Any, examples: List[Tuple[str, str]], batch_size: int, max_length: int) -> Dict[str, Any]:
+    """Accuracy, macro F1, per-class report and latency on held-out examples."""
+    texts = [text for text, _ in examples]
+    expected = [label for _, label in examples]
+    start = time.perf_counter()
+    logits = predict_logits(tokenizer, model, texts, batch_size, max_length)
+    elapsed = time.perf_counter() - start
+
+    index_labels = {index: LABEL_MAPPING.get(name, "neutral") for index, name in model.config.id2label.items()}
+    predicted = [index_labels[int(index)] for index in logits.argmax(dim=-1).tolist()]
+    return {
+        "examples": len(examples),
+        "accuracy": float(accuracy_score(expected, predicted)),
+        "macro_f1": float(f1_score(expected, predicted, labels=list(LABELS), average="macro", zero_division=0)),
+        "per_class": classification_report(expected, predicted, labels=list(LABELS), output_dict=True, zero_division=0),
+        "confusion_matrix": {
+            "labels": list(LABELS),
+            "matrix": confusion_matrix(expected, predicted, labels=list(LABELS)).tolist()
+        },
+        "ms_per_text": elapsed / max(len(texts), 1) * 1000
+    }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fine-tune or distill the sentiment model and register it")
+    parser.add_argument("--mode", choices=["finetune", "distill"], default="finetune",
+                        help="Fine-tune the served model, or distill it into a smaller student")
+    parser.add_argument("--student", default="prajjwal1/bert-tiny", help="Student checkpoint for --mode distill")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--learning-rate", type=float, help="Defaults to 2e-5 for finetune and 5e-5 for distill")
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--alpha", type=float, default=0.5, help="Weight of the hard-label loss when distilling")
+    parser.add_argument("--temperature", type=float, default=2.0, help="Softmax temperature when distilling")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threads", type=int, help="Torch CPU threads")
+    parser.add_argument("--no-files", action="store_true", help="Train on human labels from the database only")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory with labeled_news_*.json files")
+    parser.add_argument("--version", help="Registry version name (generated if omitted)")
+    parser.add_argument("--activate", action="store_true", help="Mark the new version active in the registry")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    torch.manual_seed(args.seed)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    examples = build_dataset(include_files=not args.no_files, data_dir=args.data_dir)
+    if len(examples) < 10:
+        raise SystemExit(f"Need at least 10 labeled examples, found {len(examples)}")
+    train_examples, test_examples = split_dataset(examples, args.test_size, args.seed)
+    logger.info(f"Training on {len(train_examples)} examples, evaluating on {len(test_examples)}")
+
+    # The currently served model is the baseline, the teacher and the fine-tuning start point
+    baseline_version = sentiment_analyzer.model_version
+    baseline = sentiment_analyzer.loaded
+    baseline_metrics = evaluate(baseline.tokenizer, baseline.model, test_examples, args.batch_size, args.max_length)
+    logger.info(f"Baseline {baseline_version}: accuracy {baseline_metrics['accuracy']:.3f}, "
+                f"macro F1 {baseline_metrics['macro_f1']:.3f}")
+
+    texts = [text for text, _ in train_examples]
+    teacher_probs = None
+    if args.mode == "distill":
+        tokenizer, model = create_student(args.student)
+        base_model = args.student
+        teacher_logits = predict_logits(baseline.tokenizer, baseline.model, texts, args.batch_size, args.max_length)
+        # Reorder the teacher's outputs to the student's label order
+        teacher_order = [label_ids(baseline.model)[label] for label in LABELS]
+        teacher_probs = F.softmax(teacher_logits[:, teacher_order] / args.temperature, dim=-1)
+        learning_rate = args.learning_rate or 5e-5
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(baseline.source)
+        model = AutoModelForSequenceClassification.from_pretrained(baseline.source)
+        base_model = baseline.source
+        learning_rate = args.learning_rate or 2e-5
+    model.to(sentiment_analyzer.device)
+
+    targets = [label_ids(model)[label] for _, label in train_examples]
+    history = train(
+        tokenizer, model, texts, targets, teacher_probs,
+        epochs=args.epochs, batch_size=args.batch_size, learning_rate=learning_rate,
+        max_length=args.max_length, alpha=args.alpha, temperature=args.temperature, seed=args.seed
+    )
+    metrics = evaluate(tokenizer, model, test_examples, args.batch_size, args.max_length)
+    logger.info(f"New model: accuracy {metrics['accuracy']:.3f}, macro F1 {metrics['macro_f1']:.3f}, "
+                f"{metrics['ms_per_text']:.2f} ms/text (baseline {baseline_metrics['ms_per_text']:.2f})")
+
+    version = model_registry.register(model, tokenizer, {
+        "mode": args.mode,
+        "base_model": base_model,
+        "teacher": baseline_version if args.mode == "distill" else None,
+        "parameters": {
+            "epochs": args.epochs,
+            "batch_size": args.batch_size,
+            "learning_rate": learning_rate,
+            "max_length": args.max_length,
+            "alpha": args.alpha,
+            "temperature": args.temperature,
+            "seed": args.seed
+        },
+        "data": {
+            "train_examples": len(train_examples),
+            "test_examples": len(test_examples),
+            "labeled_files": not args.no_files
+        },
+        "train_loss": history,
+        "metrics": metrics,
+        "baseline": {"version": baseline_version, "metrics": baseline_metrics}
+    }, version=args.version)
+    logger.info(f"Registered model version {version}")
+
+    if args.activate:
+        model_registry.activate(version)
+        logger.info(f"Activated {version}; POST /api/models/reload to serve it from a running API")
+
+if __name__ == "__main__":
+    main()
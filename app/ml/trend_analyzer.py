@@ -1,28 +1,145 @@
 import numpy as np
+from collections import OrderedDict
 from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from typing import List, Dict, Any
+from sklearn.decomposition import IncrementalPCA
+from sklearn.cluster import MiniBatchKMeans
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 from datetime import datetime, timedelta
 
+from app.ml.sentiment_series import LABELS
+from app.services.metrics import metrics
+
+TREND_ANALYSIS_SECONDS = metrics.histogram(
+    "trend_analysis_duration_seconds", "Time spent analyzing sentiment trends", ("stage",)
+)
+
+# Advanced analysis settings
+ADVANCED_MIN_SAMPLES = 10  # Fewer points than this return an empty analysis
+ADVANCED_CHUNK_SIZE = 4096  # Rows per partial_fit/transform call
+ADVANCED_REFIT_MIN_NEW = 50  # New rows needed before cached models are updated
+ADVANCED_REFIT_FRACTION = 0.1  # ...or this fraction of the rows being analyzed
+ADVANCED_MAX_CACHED_TICKERS = 1000
+N_CLUSTERS = 3
+FEATURE_NAMES = ["score", "confidence", "hour_sin", "hour_cos", "weekday_sin", "weekday_cos", "source_share"]
+
+class _AdvancedModels:
+    """
+    Incrementally fitted scaler, PCA and clustering for one ticker.
+
+    Rows are tracked by timestamp rather than count, so a sliding window that
+    drops old rows while new ones arrive still feeds the new rows to the
+    models. The source frequency encoding is frozen when the models are
+    created so the meaning of that feature does not shift between calls.
+    """
+
+    def __init__(self, source_shares: Optional[Dict[Any, float]] = None):
+        self.scaler = StandardScaler()
+        self.pca = IncrementalPCA(n_components=2)
+        self.kmeans = MiniBatchKMeans(n_clusters=N_CLUSTERS, random_state=0, n_init=3)
+        self.source_shares = source_shares
+        self.n_fitted = 0
+        self.last_fitted: Optional[np.datetime64] = None  # Newest timestamp fitted so far
+
+    def partial_fit(self, features: np.ndarray, times: np.ndarray) -> None:
+        chunks = list(_chunks(features))
+        for chunk in chunks:
+            self.scaler.partial_fit(chunk)
+        for chunk in chunks:
+            self.pca.partial_fit(self.scaler.transform(chunk))
+        for chunk in chunks:
+            self.kmeans.partial_fit(self.pca.transform(self.scaler.transform(chunk)))
+        self.n_fitted += len(features)
+        self.last_fitted = times[-1]
+
+    def first_new_row(self, times: np.ndarray) -> int:
+        """Index of the first row newer than anything fitted, given time ordered rows."""
+        return int(np.searchsorted(times, self.last_fitted, side="right"))
+
+    def needs_update(self, n_new: int, n_samples: int) -> bool:
+        return n_new >= max(ADVANCED_REFIT_MIN_NEW, ADVANCED_REFIT_FRACTION * n_samples)
+
+def _datetimes(df: pd.DataFrame) -> pd.Series:
+    times = df["datetime"]
+    if not pd.api.types.is_datetime64_any_dtype(times):
+        times = pd.to_datetime(times, unit="s")
+    return times
+
+def _chunks(features: np.ndarray):
+    """Split rows into chunks, folding a short tail into the previous chunk."""
+    starts = list(range(0, len(features), ADVANCED_CHUNK_SIZE))
+    if len(starts) > 1 and len(features) - starts[-1] < N_CLUSTERS:
+        starts.pop()
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(features)
+        yield features[start:end]
+
 class TrendAnalyzer:
     def __init__(self):
-        self.scaler = StandardScaler()
-        self.pca = PCA(n_components=2)
+        # Fitted advanced-analysis models per ticker, least recently used first
+        self._advanced_models: "OrderedDict[str, _AdvancedModels]" = OrderedDict()
 
-    def analyze_sentiment_trends(self, sentiment_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def analyze_sentiment_trends(
+        self,
+        sentiment_data: List[Dict[str, Any]],
+        ticker: Optional[str] = None,
+        advanced: bool = False
+    ) -> Dict[str, Any]:
         """
         Analyze sentiment trends over time.
         
         Args:
             sentiment_data (List[Dict[str, Any]]): List of sentiment data points
+            ticker (Optional[str]): Ticker the data belongs to, used to cache fitted models
+            advanced (bool): Also run PCA and clustering over the data points
             
         Returns:
             Dict[str, Any]: Trend analysis results
         """
+        return self._analyze_frame(pd.DataFrame(sentiment_data), ticker, advanced)
+
+    def analyze_columns(
+        self,
+        columns: Dict[str, np.ndarray],
+        ticker: Optional[str] = None,
+        advanced: bool = False,
+        sources: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze sentiment trends from column arrays such as a RecentArticleStore view.
+
+        Args:
+            columns (Dict[str, np.ndarray]): datetime (epoch seconds), score, confidence,
+                label_code and optionally source_id arrays
+            ticker (Optional[str]): Ticker the data belongs to, used to cache fitted models
+            advanced (bool): Also run PCA and clustering over the data points
+            sources (Optional[List[str]]): Source names indexed by source_id
+
+        Returns:
+            Dict[str, Any]: Trend analysis results
+        """
+        frame = {
+            "score": columns["score"],
+            "confidence": columns["confidence"],
+            "label": pd.Categorical.from_codes(columns["label_code"], categories=LABELS),
+            "datetime": pd.to_datetime(columns["datetime"], unit="s")
+        }
+        if sources is not None and "source_id" in columns:
+            frame["source"] = pd.Categorical.from_codes(columns["source_id"], categories=sources)
+        return self._analyze_frame(pd.DataFrame(frame, copy=False), ticker, advanced)
+
+    def _analyze_frame(self, df: pd.DataFrame, ticker: Optional[str], advanced: bool) -> Dict[str, Any]:
+        with TREND_ANALYSIS_SECONDS.time(stage="trends"):
+            stats = self._analyze_sentiment_trends(df)
+        if advanced:
+            with TREND_ANALYSIS_SECONDS.time(stage="advanced"):
+                stats["advanced_analysis"] = self._perform_advanced_analysis(df, ticker)
+        return stats
+
+    def _analyze_sentiment_trends(self, df: pd.DataFrame) -> Dict[str, Any]:
         try:
-            # Convert to DataFrame
-            df = pd.DataFrame(sentiment_data)
+            if not pd.api.types.is_datetime64_any_dtype(df["datetime"]):
+                df["datetime"] = pd.to_datetime(df["datetime"], unit="s")
             
             # Calculate basic statistics
             stats = {
@@ -95,52 +212,122 @@ class TrendAnalyzer:
         df['day'] = df['datetime'].dt.day_name()
         return df.groupby('day')['score'].mean().to_dict()
 
-    def _perform_advanced_analysis(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Perform advanced statistical analysis."""
+    def _perform_advanced_analysis(self, df: pd.DataFrame, ticker: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Perform advanced statistical analysis.
+
+        Runs incremental PCA and mini-batch k-means over score, confidence,
+        time of day, day of week and source features in fixed-size chunks.
+        Models fitted for a ticker are reused until enough new data arrives.
+        """
+        empty = {
+            "samples": int(len(df)),
+            "pca_components": [],
+            "explained_variance": [],
+            "sentiment_clusters": {
+                "cluster_centers": [],
+                "cluster_sizes": [],
+                "cluster_mean_scores": []
+            }
+        }
         try:
             # Only perform PCA if we have enough data points
-            if len(df) > 2:
-                # Perform PCA on sentiment scores
-                scores_2d = self.pca.fit_transform(
-                    self.scaler.fit_transform(df[["score"]])
-                )
-                
-                return {
-                    "pca_components": self.pca.components_.tolist(),
-                    "explained_variance": self.pca.explained_variance_ratio_.tolist(),
-                    "sentiment_clusters": self._identify_sentiment_clusters(scores_2d)
-                }
-            else:
-                # Return simplified analysis for small datasets
-                return {
-                    "pca_components": [],
-                    "explained_variance": [],
-                    "sentiment_clusters": {
-                        "cluster_centers": [],
-                        "cluster_sizes": []
-                    }
-                }
-        except Exception as e:
-            print(f"Error in advanced analysis: {str(e)}")
+            if len(df) < ADVANCED_MIN_SAMPLES:
+                return empty
+
+            df = df.sort_values("datetime", kind="stable")
+            models, features = self._get_models(ticker, df)
+
             return {
-                "pca_components": [],
-                "explained_variance": [],
-                "sentiment_clusters": {
-                    "cluster_centers": [],
-                    "cluster_sizes": []
-                }
+                "samples": int(len(df)),
+                "fitted_samples": models.n_fitted,
+                "feature_names": FEATURE_NAMES,
+                "pca_components": models.pca.components_.tolist(),
+                "explained_variance": models.pca.explained_variance_ratio_.tolist(),
+                "sentiment_clusters": self._identify_sentiment_clusters(models, features, df["score"].to_numpy())
             }
+        except Exception as e:
+            print(f"Error in advanced analysis: {str(e)}")
+            return empty
+
+    def _build_feature_matrix(self, df: pd.DataFrame, source_shares: Optional[Dict[Any, float]] = None) -> np.ndarray:
+        """Build the feature matrix used for PCA and clustering, encoding sources with the given shares."""
+        times = _datetimes(df)
+        hours = times.dt.hour.to_numpy() + times.dt.minute.to_numpy() / 60.0
+        weekdays = times.dt.weekday.to_numpy()
+        n = len(df)
+        confidence = df["confidence" if "confidence" in df else "score"].to_numpy(dtype=np.float64)
+        if "source" in df and source_shares is not None:
+            # Sources that were not seen when the models were fitted have no share
+            source_share = df["source"].astype(object).map(source_shares).fillna(0.0).to_numpy(dtype=np.float64)
+        else:
+            source_share = np.ones(n)
+
+        features = np.empty((n, len(FEATURE_NAMES)), dtype=np.float64)
+        features[:, 0] = df["score"].to_numpy(dtype=np.float64)
+        features[:, 1] = confidence
+        # Cyclical encoding so 23:00 sits next to 00:00 and Sunday next to Monday
+        features[:, 2] = np.sin(2 * np.pi * hours / 24)
+        features[:, 3] = np.cos(2 * np.pi * hours / 24)
+        features[:, 4] = np.sin(2 * np.pi * weekdays / 7)
+        features[:, 5] = np.cos(2 * np.pi * weekdays / 7)
+        features[:, 6] = source_share
+        return features
+
+    def _get_models(self, ticker: Optional[str], df: pd.DataFrame) -> Tuple[_AdvancedModels, np.ndarray]:
+        """
+        Return fitted models for a ticker and the feature matrix of df.
+
+        Cached models are updated with the rows newer than the last fitted
+        timestamp once enough of them arrived, and rebuilt once none of the
+        rows they were fitted on is left in df.
+        """
+        times = _datetimes(df).to_numpy()
+        models = self._advanced_models.get(ticker) if ticker else None
+        if models is not None and times[0] > models.last_fitted:
+            models = None
+
+        if models is None:
+            # Frequency encoding keeps one column however many sources there are
+            shares = df["source"].astype(object).value_counts(normalize=True).to_dict() if "source" in df else None
+            models = _AdvancedModels(shares)
+            features = self._build_feature_matrix(df, models.source_shares)
+            models.partial_fit(features, times)
+        else:
+            features = self._build_feature_matrix(df, models.source_shares)
+            start = models.first_new_row(times)
+            if models.needs_update(len(times) - start, len(times)):
+                models.partial_fit(features[start:], times[start:])
+
+        if ticker:
+            self._advanced_models[ticker] = models
+            self._advanced_models.move_to_end(ticker)
+            while len(self._advanced_models) > ADVANCED_MAX_CACHED_TICKERS:
+                self._advanced_models.popitem(last=False)
+        return models, features
 
-    def _identify_sentiment_clusters(self, scores_2d: np.ndarray) -> Dict[str, Any]:
+    def _identify_sentiment_clusters(
+        self,
+        models: _AdvancedModels,
+        features: np.ndarray,
+        scores: np.ndarray
+    ) -> Dict[str, Any]:
         """Identify clusters in sentiment data."""
-        from sklearn.cluster import KMeans
-        
-        kmeans = KMeans(n_clusters=3)
-        clusters = kmeans.fit_predict(scores_2d)
-        
+        sizes = np.zeros(N_CLUSTERS, dtype=np.int64)
+        score_sums = np.zeros(N_CLUSTERS)
+        offset = 0
+        for chunk in _chunks(features):
+            clusters = models.kmeans.predict(models.pca.transform(models.scaler.transform(chunk)))
+            sizes += np.bincount(clusters, minlength=N_CLUSTERS)
+            score_sums += np.bincount(clusters, weights=scores[offset:offset + len(chunk)], minlength=N_CLUSTERS)
+            offset += len(chunk)
+
         return {
-            "cluster_centers": kmeans.cluster_centers_.tolist(),
-            "cluster_sizes": np.bincount(clusters).tolist()
+            "cluster_centers": models.kmeans.cluster_centers_.tolist(),
+            "cluster_sizes": sizes.tolist(),
+            "cluster_mean_scores": [
+                float(total / size) if size else None for total, size in zip(score_sums, sizes)
+            ]
         }
 
 # Create singleton instance
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class NewsSubscription:
+    """A single client's subscription to one or more tickers."""
+
+    def __init__(self, tickers: Iterable[str], max_queue_size: int):
+        self.tickers = {ticker.upper() for ticker in tickers}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+
+    def offer(self, event: str) -> None:
+        """Queue a pre-serialized event, dropping it if the client is too slow."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+
+class NewsBroadcaster:
+    """
+    In-process pub/sub fan-out of newly ingested articles.
+
+    Each published batch is serialized once per ticker and the same string is
+    handed to every subscriber of that ticker, so the cost of an ingestion does
+    not grow with per-subscriber work beyond a queue append.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[str, Set[NewsSubscription]] = {}
+
+    def subscribe(self, tickers: Iterable[str]) -> NewsSubscription:
+        """Register a new subscription for the given tickers."""
+        subscription = NewsSubscription(tickers, self.max_queue_size)
+        for ticker in subscription.tickers:
+            self._subscribers.setdefault(ticker, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: NewsSubscription) -> None:
+        """Remove a subscription from every ticker it listens to."""
+        for ticker in subscription.tickers:
+            subscribers = self._subscribers.get(ticker)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[ticker]
+
+    def subscriber_count(self, ticker: Optional[str] = None) -> int:
+        """Number of subscriptions for a ticker, or distinct subscriptions overall."""
+        if ticker is not None:
+            return len(self._subscribers.get(ticker.upper(), ()))
+        return len(set().union(*self._subscribers.values())) if self._subscribers else 0
+
+    def publish(self, ticker: str, articles: List[Dict[str, Any]]) -> int:
+        """
+        Push newly ingested articles to every subscriber of a ticker.
+
+        Args:
+            ticker (str): Stock ticker symbol the articles were ingested for
+            articles (List[Dict[str, Any]]): Articles with their sentiment
+
+        Returns:
+            int: Number of subscribers the event was delivered to
+        """
+        ticker = ticker.upper()
+        subscribers = self._subscribers.get(ticker)
+        if not subscribers or not articles:
+            return 0
+
+        event = format_sse(
+            json.dumps({"ticker": ticker, "articles": articles}, default=str),
+            event="news"
+        )
+        for subscription in list(subscribers):
+            subscription.offer(event)
+        return len(subscribers)
+
+
+def format_sse(data: str, event: Optional[str] = None) -> str:
+    """Format a payload as a server-sent event frame."""
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
+
+
+# Create a singleton instance
+news_broadcaster = NewsBroadcaster()
@@ -1,65 +1,464 @@
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple
 
 import finnhub
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
 
 from app.config import settings
 from app.database.database import SessionLocal
-from app.database.models import NewsArticle, SentimentAnalysis
+from app.database.models import ArticleTicker, NewsArticle, SentimentAnalysis
 from app.ml.sentiment_analyzer import sentiment_analyzer
+from app.ml.near_duplicate import NearDuplicateDetector
+from app.ml.sentiment_series import model_predictions
+from app.ml.ticker_tagger import TickerTagger, load_ticker_tagger
+from app.services.news_broadcaster import news_broadcaster
+from app.services.recent_articles import recent_articles
+from app.services.rate_limiter import finnhub_rate_limiter
+from app.services.metrics import metrics, FINNHUB_CALLS, CACHE_REQUESTS
+
+# Maximum number of URLs per IN (...) lookup
+URL_LOOKUP_CHUNK_SIZE = 500
+# Seconds before retrying a failed ticker dictionary download
+TAGGER_RETRY_SECONDS = 300
+# Sentiment served for articles whose analysis failed; never stored
+FAILED_SENTIMENT = {"label": "neutral", "score": 0.0, "confidence": 0.0}
+
+NEWS_STAGE_SECONDS = metrics.histogram(
+    "news_stage_duration_seconds", "Time spent in each NewsService ingestion stage", ("stage",)
+)
 
 class NewsService:
     def __init__(self):
         self.client = finnhub.Client(api_key=settings.FINNHUB_API_KEY)
+        self.client.API_URL = settings.FINNHUB_API_URL
+        self._cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+        self.duplicates = NearDuplicateDetector(
+            threshold=settings.NEAR_DUPLICATE_THRESHOLD,
+            max_entries=settings.NEAR_DUPLICATE_INDEX_SIZE
+        )
+        self._duplicates_warmed = False
+        self.tagger: Optional[TickerTagger] = None
+        self._tagger_retry_at = 0.0
+        # Ingestion runs in the default executor; the duplicate index is not thread safe
+        self._ingest_lock = threading.Lock()
+        # Canonical URLs indexed by an ingestion whose inference has not finished yet
+        self._in_flight: Dict[str, threading.Event] = {}
 
     async def get_news(self, ticker: str) -> List[Dict[str, Any]]:
         """
         Fetch news for a given ticker from Finnhub and store in database
         """
+        ticker = ticker.upper()
         try:
+            cached = self._get_cached(ticker)
+            if cached is not None:
+                if ticker not in recent_articles:
+                    self._remember_recent(ticker, cached, [])
+                return cached
+
             # Fetch news from Finnhub
-            news = self.client.company_news(ticker, _from="2024-01-01", to=datetime.now().strftime("%Y-%m-%d"))
-            
-            # Transform and analyze sentiment
-            transformed_news = []
-            for article in news:
-                # Analyze sentiment
-                sentiment = sentiment_analyzer.analyze_text(article['headline'])
-                
-                transformed_article = {
-                    "headline": article['headline'],
-                    "url": article['url'],
-                    "datetime": article['datetime'],
-                    "source": article['source'],
-                    "content": article.get('summary', ''),
-                    "sentiment": sentiment
-                }
-                transformed_news.append(transformed_article)
-            
-            # Store in database
-            with SessionLocal() as db:
-                self._store_news(db, transformed_news, ticker)
-            
-            return transformed_news
-            
+            news = await self._fetch_company_news(ticker)
+            await self._ensure_tagger()
+
+            # Analyze sentiment, store and publish
+            return (await self._ingest({ticker: news}))[ticker]
+
         except Exception as e:
             print(f"Error fetching news for {ticker}: {str(e)}")
             raise
 
-    def _store_news(self, db: Session, news: List[Dict[str, Any]], ticker: str) -> None:
-        """Store news articles in the database."""
-        for article in news:
-            if not self._article_exists(db, article['url']):
-                new_article = self._create_article(db, article, ticker)
-                self._create_sentiment(db, new_article.id)
+    async def get_news_bulk(self, tickers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch news for several tickers in one pass.
+
+        Tickers missing from the cache are fetched concurrently under the shared
+        Finnhub rate limit and all of their new headlines are analyzed together.
+
+        Args:
+            tickers (Iterable[str]): Stock ticker symbols
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per-ticker result with status and data or error detail
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for ticker in dict.fromkeys(ticker.upper() for ticker in tickers):
+            cached = self._get_cached(ticker)
+            if cached is not None:
+                if ticker not in recent_articles:
+                    self._remember_recent(ticker, cached, [])
+                results[ticker] = {"status": "success", "data": cached}
+            else:
+                missing.append(ticker)
+
+        fetched = await asyncio.gather(
+            *(self._fetch_company_news(ticker) for ticker in missing),
+            return_exceptions=True
+        )
+
+        raw_news = {}
+        for ticker, news in zip(missing, fetched):
+            if isinstance(news, Exception):
+                print(f"Error fetching news for {ticker}: {str(news)}")
+                results[ticker] = {"status": "error", "detail": str(news)}
+            else:
+                raw_news[ticker] = news
+
+        if raw_news:
+            await self._ensure_tagger()
+            for ticker, news in (await self._ingest(raw_news)).items():
+                results[ticker] = {"status": "success", "data": news}
+
+        return results
+
+    async def ingest_general_news(self, category: str = "general") -> Dict[str, Any]:
+        """
+        Ingest one page of Finnhub general news and attribute it to every ticker it mentions.
+
+        Articles are stored without a requesting ticker; their sentiment reaches
+        each mentioned ticker through the article-ticker tags, so one call feeds
+        many tickers without per-ticker requests.
+
+        Args:
+            category (str): Finnhub news category (general, forex, crypto or merger)
+
+        Returns:
+            Dict[str, Any]: Number of articles and articles per tagged ticker
+        """
+        news = await self._call_finnhub("general_news", lambda: self.client.general_news(category, min_id=0))
+        await self._ensure_tagger()
+        articles = (await self._ingest({None: news}))[None]
+
+        mentions: Dict[str, int] = defaultdict(int)
+        for article in articles:
+            for ticker in article['tickers']:
+                mentions[ticker] += 1
+        return {
+            "category": category,
+            "articles": len(articles),
+            "tickers": dict(sorted(mentions.items(), key=lambda item: -item[1]))
+        }
+
+    async def _fetch_company_news(self, ticker: str) -> List[Dict[str, Any]]:
+        """Fetch raw company news without blocking the event loop."""
+        return await self._call_finnhub(
+            "company_news",
+            lambda: self.client.company_news(ticker, _from="2024-01-01", to=datetime.now().strftime("%Y-%m-%d"))
+        )
+
+    async def _call_finnhub(self, endpoint: str, call: Callable[[], Any]) -> Any:
+        """Run a blocking Finnhub call under the shared rate limit in the default executor."""
+        with NEWS_STAGE_SECONDS.time(stage="rate_limit_wait"):
+            await finnhub_rate_limiter.acquire()
+        loop = asyncio.get_running_loop()
+        with NEWS_STAGE_SECONDS.time(stage="fetch"):
+            try:
+                result = await loop.run_in_executor(None, call)
+            except Exception:
+                FINNHUB_CALLS.inc(endpoint=endpoint, outcome="error")
+                raise
+        FINNHUB_CALLS.inc(endpoint=endpoint, outcome="success")
+        return result
+
+    async def _ensure_tagger(self) -> None:
+        """Load the ticker tagger, downloading the symbol list on first use."""
+        if self.tagger is not None or time.monotonic() < self._tagger_retry_at:
+            return
+        try:
+            symbols = None
+            if not os.path.exists(settings.TICKER_DICTIONARY_PATH):
+                symbols = await self._call_finnhub("stock_symbols", lambda: self.client.stock_symbols("US"))
+            loop = asyncio.get_running_loop()
+            self.tagger = await loop.run_in_executor(None, lambda: load_ticker_tagger(lambda: symbols))
+        except Exception as e:
+            print(f"Error loading ticker dictionary: {str(e)}")
+            self._tagger_retry_at = time.monotonic() + TAGGER_RETRY_SECONDS
+
+    async def _ingest(self, raw_news: Dict[Optional[str], List[Dict[str, Any]]]) -> Dict[Optional[str], List[Dict[str, Any]]]:
+        """
+        Analyze, store and publish raw Finnhub articles for one or more tickers.
+
+        Inference and database writes run in the default executor so they do
+        not block the event loop; publishing happens back on the loop. The None
+        key holds articles that were not requested for a ticker, such as
+        general news.
+        """
+        loop = asyncio.get_running_loop()
+        transformed, new_by_ticker, failed = await loop.run_in_executor(None, self._analyze_and_store, raw_news)
+
+        for ticker, news in transformed.items():
+            if ticker is not None:
+                # Notify stream subscribers about articles we have not seen before
+                news_broadcaster.publish(ticker, new_by_ticker[ticker])
+                self._remember_recent(ticker, news, new_by_ticker[ticker])
+                # Retry failed analyses on the next request instead of serving them from the cache
+                if not failed:
+                    self._cache[ticker] = (time.monotonic(), news)
+            self._fan_out(ticker, new_by_ticker[ticker])
 
-    def _article_exists(self, db: Session, url: str) -> bool:
-        """Check if an article already exists in the database."""
-        return db.query(NewsArticle).filter(NewsArticle.url == url).first() is not None
+        return transformed
 
-    def _create_article(self, db: Session, article: Dict[str, Any], ticker: str) -> NewsArticle:
-        """Create a new article in the database."""
+    def _analyze_and_store(
+        self, raw_news: Dict[Optional[str], List[Dict[str, Any]]]
+    ) -> Tuple[Dict[Optional[str], List[Dict[str, Any]]], Dict[Optional[str], List[Dict[str, Any]]], bool]:
+        """
+        Tag, analyze and store raw articles; returns the articles, the new ones per ticker and whether analysis failed.
+
+        Headlines already stored reuse their sentiment, near-duplicates of an
+        indexed headline share the sentiment of that canonical article, and every
+        remaining headline across all tickers is analyzed in a single batch.
+        Articles whose analysis failed are returned with the neutral fallback but
+        not stored, so they are analyzed again on the next fetch. Concurrent
+        ingestions only serialize on the near-duplicate index; inference and
+        database writes run outside its lock.
+        """
+        transformed = {
+            ticker: [self._transform_article(article) for article in news]
+            for ticker, news in raw_news.items()
+        }
+        for ticker, news in transformed.items():
+            for article in news:
+                article['tickers'] = self._tag_article(article, ticker)
+        all_articles = [article for news in transformed.values() for article in news]
+
+        with SessionLocal() as db:
+            with NEWS_STAGE_SECONDS.time(stage="lookup"):
+                with self._ingest_lock:
+                    if not self._duplicates_warmed:
+                        self._warm_duplicate_index(db)
+                stored = self._load_stored_sentiment(db, [article['url'] for article in all_articles])
+
+            # Link unseen articles to a canonical one or queue them for inference
+            pending = []
+            linked = []
+            claimed = set()
+            # Articles a concurrent ingestion indexed under their own URL; that ingestion stores them
+            foreign = set()
+            waiting: Dict[str, threading.Event] = {}
+            with self._ingest_lock:
+                for article in all_articles:
+                    if article['url'] in stored:
+                        article['sentiment'], article['duplicate_of'] = stored[article['url']]
+                        continue
+                    match = self.duplicates.find(article['headline'])
+                    if match is None:
+                        self.duplicates.add(article['url'], article['headline'])
+                        self._in_flight.setdefault(article['url'], threading.Event())
+                        claimed.add(article['url'])
+                        pending.append(article)
+                        continue
+                    if match[0] in self._in_flight and match[0] not in claimed:
+                        waiting[match[0]] = self._in_flight[match[0]]
+                        if match[0] == article['url']:
+                            foreign.add(article['url'])
+                    if match[0] != article['url']:
+                        article['duplicate_of'] = match[0]
+                    linked.append((article, match[0], match[1]))
+
+            try:
+                results = []
+                try:
+                    with NEWS_STAGE_SECONDS.time(stage="inference"):
+                        results = sentiment_analyzer.analyze_batch([article['headline'] for article in pending])
+                finally:
+                    self._publish_pending(pending, results)
+                analyzed = {article['url']: article['sentiment'] for article in pending}
+
+                # Canonicals analyzed by a concurrent ingestion are shared once its inference finishes
+                for event in waiting.values():
+                    event.wait()
+                with self._ingest_lock:
+                    for article, canonical_url, matched in linked:
+                        # Large batches can evict a canonical from the index after it matched
+                        sentiment = analyzed.get(canonical_url)
+                        if sentiment is None:
+                            sentiment = self.duplicates.get(canonical_url) if canonical_url in self.duplicates else matched
+                        article['sentiment'] = sentiment if sentiment is not None else dict(FAILED_SENTIMENT)
+
+                # Store in database
+                failed = [article for article in all_articles if self._analysis_failed(article['sentiment'])]
+                skip = set(stored) | foreign | {article['url'] for article in failed}
+                with NEWS_STAGE_SECONDS.time(stage="store"):
+                    new_by_ticker = self._store_news_batch(db, {
+                        ticker: [article for article in news if article['url'] not in skip]
+                        for ticker, news in transformed.items()
+                    })
+            finally:
+                # Keep the claims until the articles are committed so no other ingestion stores them twice
+                with self._ingest_lock:
+                    for url in claimed:
+                        self._in_flight.pop(url).set()
+
+        return transformed, new_by_ticker, bool(failed)
+
+    def _publish_pending(self, pending: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> None:
+        """Record the sentiment of freshly analyzed canonicals in the index and wake waiting ingestions."""
+        with self._ingest_lock:
+            for index, article in enumerate(pending):
+                sentiment = results[index] if index < len(results) else None
+                article['sentiment'] = sentiment if sentiment is not None else dict(FAILED_SENTIMENT)
+                if self._analysis_failed(sentiment):
+                    # Drop the fallback so later duplicates are not linked to it
+                    self.duplicates.discard(article['url'])
+                elif article['url'] in self.duplicates:
+                    self.duplicates.set_value(article['url'], sentiment)
+                self._in_flight[article['url']].set()
+
+    @staticmethod
+    def _analysis_failed(sentiment: Optional[Dict[str, Any]]) -> bool:
+        """Whether a sentiment is the neutral fallback returned when the model could not score a headline."""
+        return sentiment is None or sentiment.get('confidence', 0) <= 0
+
+    def _tag_article(self, article: Dict[str, Any], ticker: Optional[str]) -> List[str]:
+        """Tickers mentioned in an article, starting with the one it was requested for."""
+        tickers = self.tagger.tag(f"{article['headline']}\n{article['content'] or ''}") if self.tagger else []
+        if ticker is not None:
+            ticker = ticker.upper()
+            tickers = [ticker] + [tagged for tagged in tickers if tagged != ticker]
+        return tickers
+
+    def _fan_out(self, ticker: Optional[str], new_articles: List[Dict[str, Any]]) -> None:
+        """Deliver new articles to the other tickers they mention."""
+        by_ticker: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        source = ticker.upper() if ticker is not None else None
+        for article in new_articles:
+            for tagged in article.get('tickers', ()):
+                if tagged != source:
+                    by_ticker[tagged].append(article)
+        for tagged, articles in by_ticker.items():
+            news_broadcaster.publish(tagged, articles)
+            # Only extend stores that were already seeded from the ticker's own feed
+            if tagged in recent_articles:
+                recent_articles.append(tagged, [article for article in articles if not article.get('duplicate_of')])
+
+    def _warm_duplicate_index(self, db: Session) -> None:
+        """Seed the near-duplicate index with the most recent canonical articles."""
+        rows = (
+            db.query(NewsArticle.url, NewsArticle.headline, SentimentAnalysis.label,
+                     SentimentAnalysis.score, SentimentAnalysis.confidence, SentimentAnalysis.model_version)
+            .join(SentimentAnalysis, SentimentAnalysis.article_id == NewsArticle.id)
+            .filter(NewsArticle.canonical_id.is_(None), SentimentAnalysis.confidence > 0, model_predictions())
+            .order_by(NewsArticle.published_at.desc())
+            .limit(self.duplicates.max_entries)
+            .all()
+        )
+        # Oldest first so the most recent articles are evicted last
+        for url, headline, label, score, confidence, model_version in reversed(rows):
+            self.duplicates.add(url, headline, {
+                "label": label, "score": score, "confidence": confidence, "model_version": model_version
+            })
+        self._duplicates_warmed = True
+
+    def _remember_recent(self, ticker: str, news: List[Dict[str, Any]], new_articles: List[Dict[str, Any]]) -> None:
+        """Feed canonical articles into the in-memory recent article store."""
+        # Seed a ticker with everything we have, afterwards only append new articles
+        articles = new_articles if ticker in recent_articles else news
+        recent_articles.append(ticker, [article for article in articles if not article.get('duplicate_of')])
+
+    def _get_cached(self, ticker: str) -> Any:
+        """Return cached news for a ticker if it is still fresh."""
+        entry = self._cache.get(ticker)
+        if entry is not None and time.monotonic() - entry[0] > settings.NEWS_CACHE_TTL_SECONDS:
+            del self._cache[ticker]
+            entry = None
+        CACHE_REQUESTS.inc(cache="news", result="miss" if entry is None else "hit")
+        return None if entry is None else entry[1]
+
+    def _transform_article(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a Finnhub article to our format."""
+        return {
+            "headline": article['headline'],
+            "url": article['url'],
+            "datetime": article['datetime'],
+            "source": article['source'],
+            "content": article.get('summary', ''),
+            "sentiment": None,
+            "duplicate_of": None,
+            "tickers": []
+        }
+
+    def _load_stored_sentiment(self, db: Session, urls: List[str]) -> Dict[str, Tuple[Dict[str, Any], Any]]:
+        """Load the stored sentiment and canonical URL of already ingested articles keyed by URL."""
+        stored = {}
+        canonical = aliased(NewsArticle)
+        unique_urls = list(dict.fromkeys(urls))
+        for start in range(0, len(unique_urls), URL_LOOKUP_CHUNK_SIZE):
+            rows = (
+                db.query(NewsArticle.url, SentimentAnalysis.label, SentimentAnalysis.score,
+                         SentimentAnalysis.confidence, SentimentAnalysis.model_version, canonical.url)
+                .join(SentimentAnalysis, SentimentAnalysis.article_id == NewsArticle.id)
+                .outerjoin(canonical, canonical.id == NewsArticle.canonical_id)
+                .filter(NewsArticle.url.in_(unique_urls[start:start + URL_LOOKUP_CHUNK_SIZE]))
+                # Skip legacy placeholder rows that were stored without a prediction
+                .filter(SentimentAnalysis.confidence > 0, model_predictions())
+                .all()
+            )
+            for url, label, score, confidence, model_version, canonical_url in rows:
+                sentiment = {"label": label, "score": score, "confidence": confidence, "model_version": model_version}
+                stored[url] = (sentiment, canonical_url)
+        return stored
+
+    def _store_news(self, db: Session, news: List[Dict[str, Any]], ticker: Optional[str]) -> List[Dict[str, Any]]:
+        """Store news articles in the database and return the ones that were new."""
+        return self._store_news_batch(db, {ticker: news})[ticker]
+
+    def _store_news_batch(
+        self, db: Session, news_by_ticker: Dict[Optional[str], List[Dict[str, Any]]]
+    ) -> Dict[Optional[str], List[Dict[str, Any]]]:
+        """
+        Store the articles of several tickers in one transaction and return the new ones per ticker.
+
+        Existing URLs and canonical ids are looked up with chunked IN queries,
+        new rows are inserted in a single flush and the batch is committed once.
+        An article listed under several tickers is stored for the first one.
+        """
+        new_by_ticker: Dict[Optional[str], List[Dict[str, Any]]] = {ticker: [] for ticker in news_by_ticker}
+        candidates: Dict[str, Tuple[Optional[str], Dict[str, Any]]] = {}
+        for ticker, news in news_by_ticker.items():
+            for article in news:
+                candidates.setdefault(article['url'], (ticker, article))
+        existing = self._article_ids(db, list(candidates))
+
+        rows = {}
+        for url, (ticker, article) in candidates.items():
+            if url not in existing:
+                rows[url] = self._create_article(db, article, ticker)
+                new_by_ticker[ticker].append(article)
+        if not rows:
+            return new_by_ticker
+        db.flush()
+
+        # Canonical articles are either part of this batch or already stored
+        ids = {url: row.id for url, row in rows.items()}
+        duplicate_of = {article['duplicate_of'] for _, article in candidates.values() if article.get('duplicate_of')}
+        ids.update(self._article_ids(db, [url for url in duplicate_of if url not in ids]))
+        for url, row in rows.items():
+            ticker, article = candidates[url]
+            if article.get('duplicate_of'):
+                row.canonical_id = ids.get(article['duplicate_of'])
+            self._create_ticker_tags(db, row.id, article.get('tickers') or ([ticker.upper()] if ticker else []))
+            self._create_sentiment(db, row.id, article['sentiment'])
+        db.commit()
+        return new_by_ticker
+
+    def _article_ids(self, db: Session, urls: List[str]) -> Dict[str, int]:
+        """Look up the ids of stored articles by URL."""
+        ids = {}
+        for start in range(0, len(urls), URL_LOOKUP_CHUNK_SIZE):
+            ids.update(
+                db.query(NewsArticle.url, NewsArticle.id)
+                .filter(NewsArticle.url.in_(urls[start:start + URL_LOOKUP_CHUNK_SIZE]))
+                .all()
+            )
+        return ids
+
+    def _create_article(self, db: Session, article: Dict[str, Any], ticker: Optional[str]) -> NewsArticle:
+        """Create a new article in the session; it is written on the next flush."""
         new_article = NewsArticle(
             headline=article['headline'],
             url=article['url'],
@@ -69,20 +468,22 @@ class NewsService:
             content=article.get('content', '')
         )
         db.add(new_article)
-        db.commit()
-        db.refresh(new_article)
         return new_article
 
-    def _create_sentiment(self, db: Session, article_id: int) -> None:
-        """Create a placeholder sentiment analysis for an article."""
+    def _create_ticker_tags(self, db: Session, article_id: int, tickers: Iterable[str]) -> None:
+        """Associate an article with every ticker it mentions."""
+        db.add_all(ArticleTicker(article_id=article_id, ticker=ticker) for ticker in dict.fromkeys(tickers))
+
+    def _create_sentiment(self, db: Session, article_id: int, result: Dict[str, Any]) -> None:
+        """Store the sentiment analysis for an article."""
         sentiment = SentimentAnalysis(
             article_id=article_id,
-            score=0.0,
-            label="neutral",
-            confidence=0.0
+            score=result['score'],
+            label=result['label'],
+            confidence=result['confidence'],
+            model_version=result.get('model_version')
         )
         db.add(sentiment)
-        db.commit()
 
 # Create a singleton instance
 news_service = NewsService()
@@ -0,0 +1,42 @@
+import asyncio
+import time
+from typing import Optional
+
+from app.config import settings
+
+class AsyncRateLimiter:
+    """
+    Token bucket limiter shared by every coroutine that calls an upstream API.
+
+    Args:
+        calls_per_minute (int): Sustained number of calls allowed per minute
+        burst (Optional[int]): Maximum number of calls that may be made back to back
+    """
+
+    def __init__(self, calls_per_minute: int, burst: Optional[int] = None):
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+        if burst is not None and burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = calls_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, calls_per_minute // 6))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a call is allowed under the configured rate."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+# Shared by all services calling Finnhub so they stay under one account limit
+finnhub_rate_limiter = AsyncRateLimiter(settings.FINNHUB_CALLS_PER_MINUTE)
@@ -0,0 +1,297 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.ml.sentiment_series import LABELS
+from app.services.metrics import metrics
+
+LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
+NEUTRAL_CODE = LABEL_CODES["neutral"]
+
+# Longest headline kept, in UTF-8 bytes
+MAX_HEADLINE_BYTES = 512
+
+# timestamp, score, confidence, label, source, headline
+ArticleRow = Tuple[int, float, float, str, str, str]
+
+RECENT_ARTICLES_LATE = metrics.counter(
+    "recent_articles_late_total",
+    "Articles older than the newest buffered one, merged in order or dropped when older than a full buffer",
+    ("result",)
+)
+
+class SourceTable:
+    """Interns source names so each article stores a small integer id."""
+
+    def __init__(self, max_sources: int = np.iinfo(np.uint16).max):
+        self.max_sources = max_sources
+        self.names: List[str] = ["other"]
+        self._ids: Dict[str, int] = {"other": 0}
+
+    def intern(self, name: str) -> int:
+        source_id = self._ids.get(name)
+        if source_id is None:
+            if len(self.names) >= self.max_sources:
+                return 0
+            source_id = len(self.names)
+            self._ids[name] = source_id
+            self.names.append(name)
+        return source_id
+
+class ArticleRingBuffer:
+    """
+    Fixed-capacity ring buffer of recent articles stored as typed column arrays.
+
+    Every column is allocated at twice its current size and each value is
+    written at both slot i and slot i + size, so the live window is always one
+    contiguous slice and view() can return it without copying. Headlines are
+    UTF-8 bytes in a circular arena addressed by offset and length. Storage
+    starts small and doubles until it reaches the capacity; the arena also
+    doubles whenever longer headlines would evict articles before then.
+
+    Args:
+        capacity (int): Maximum number of articles kept
+        sources (SourceTable): Shared table of interned source names
+        headline_bytes (int): Average headline size used to size the arena
+        initial_size (int): Number of slots allocated up front
+    """
+
+    def __init__(self, capacity: int, sources: SourceTable, headline_bytes: int = 96, initial_size: int = 16):
+        self.capacity = capacity
+        self.sources = sources
+        self.headline_bytes = headline_bytes
+        self._head = 0
+        self._count = 0
+        self._allocate(min(capacity, initial_size))
+
+    def _allocate(self, size: int, arena_bytes: int = 0) -> None:
+        self._size = size
+        self._timestamps = np.zeros(2 * size, dtype=np.int64)
+        self._scores = np.zeros(2 * size, dtype=np.float32)
+        self._confidences = np.zeros(2 * size, dtype=np.float32)
+        self._labels = np.zeros(2 * size, dtype=np.uint8)
+        self._source_ids = np.zeros(2 * size, dtype=np.uint16)
+        self._headline_offsets = np.zeros(2 * size, dtype=np.uint32)
+        self._headline_lengths = np.zeros(2 * size, dtype=np.uint16)
+        self._arena = bytearray(max(size * self.headline_bytes, arena_bytes, MAX_HEADLINE_BYTES))
+        self._arena_cursor = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the column arrays and headline arena."""
+        columns = (self._timestamps, self._scores, self._confidences, self._labels,
+                   self._source_ids, self._headline_offsets, self._headline_lengths)
+        return sum(column.nbytes for column in columns) + len(self._arena)
+
+    def append(self, timestamp: int, score: float, confidence: float, label: str, source: str, headline: str) -> None:
+        """Append one article, overwriting the oldest when the buffer is full. O(1)."""
+        if self._count == self._size:
+            if self._size < self.capacity:
+                self._grow(min(self.capacity, 2 * self._size), len(self._arena))
+            else:
+                self._drop_oldest()
+
+        encoded = headline.encode("utf-8")[:MAX_HEADLINE_BYTES]
+        offset = self._reserve_headline(len(encoded))
+        self._arena[offset:offset + len(encoded)] = encoded
+
+        slot = (self._head + self._count) % self._size
+        for index in (slot, slot + self._size):
+            self._timestamps[index] = timestamp
+            self._scores[index] = score
+            self._confidences[index] = confidence
+            self._labels[index] = LABEL_CODES.get(label, NEUTRAL_CODE)
+            self._source_ids[index] = self.sources.intern(source)
+            self._headline_offsets[index] = offset
+            self._headline_lengths[index] = len(encoded)
+        self._count += 1
+
+    def merge(self, rows: List[ArticleRow]) -> int:
+        """
+        Insert time ordered rows that may be older than buffered articles, keeping the buffer ordered. O(n).
+
+        The buffer is rebuilt from the merged rows; when more rows than the
+        capacity remain, the oldest ones are dropped.
+
+        Returns:
+            int: Number of the given rows that were dropped
+        """
+        columns = self.view()
+        buffered = list(zip(
+            columns["datetime"].tolist(), columns["score"].tolist(), columns["confidence"].tolist(),
+            [LABELS[code] for code in columns["label_code"].tolist()],
+            [self.sources.names[source_id] for source_id in columns["source_id"].tolist()],
+            self.headlines()
+        ))
+        # Stable sort keeps buffered articles ahead of new ones with the same timestamp
+        merged = sorted([(row, False) for row in buffered] + [(row, True) for row in rows], key=lambda item: item[0][0])
+        dropped = sum(1 for _, new in merged[:-self.capacity] if new)
+
+        self._head = 0
+        self._count = 0
+        self._arena_cursor = 0
+        for row, _ in merged[-self.capacity:]:
+            self.append(*row)
+        return dropped
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp of the newest buffered article."""
+        return int(self._timestamps[self._head + self._count - 1]) if self._count else None
+
+    def _drop_oldest(self) -> None:
+        self._head = (self._head + 1) % self._size
+        self._count -= 1
+
+    def _grow(self, size: int, arena_bytes: int) -> None:
+        """Reallocate larger storage, compacting live articles to the start. Amortized O(1) per append."""
+        columns = {name: column.copy() for name, column in self.view().items()}
+        headlines = [headline.encode("utf-8") for headline in self.headlines()]
+        count = self._count
+        self._allocate(size, arena_bytes)
+
+        offsets = np.zeros(count, dtype=np.uint32)
+        for index, encoded in enumerate(headlines):
+            offsets[index] = self._arena_cursor
+            self._arena[self._arena_cursor:self._arena_cursor + len(encoded)] = encoded
+            self._arena_cursor += len(encoded)
+        lengths = np.fromiter((len(encoded) for encoded in headlines), dtype=np.uint16, count=count)
+
+        for start in (0, self._size):
+            window = slice(start, start + count)
+            self._timestamps[window] = columns["datetime"]
+            self._scores[window] = columns["score"]
+            self._confidences[window] = columns["confidence"]
+            self._labels[window] = columns["label_code"]
+            self._source_ids[window] = columns["source_id"]
+            self._headline_offsets[window] = offsets
+            self._headline_lengths[window] = lengths
+        self._head = 0
+
+    def _reserve_headline(self, length: int) -> int:
+        """Find arena space for a headline, evicting the oldest articles it would overwrite."""
+        if self._count < self.capacity and self._overwrites_live(length):
+            # Only a full buffer evicts; until then make room by doubling the arena
+            self._grow(self._size, 2 * len(self._arena))
+        start = self._arena_cursor
+        if start + length > len(self._arena):
+            # Articles in the unused tail are the oldest ones; drop them before wrapping
+            while self._count and self._headline_offsets[self._head] >= start:
+                self._drop_oldest()
+            start = 0
+        while self._count:
+            oldest_offset = int(self._headline_offsets[self._head])
+            if oldest_offset >= start + length or oldest_offset + int(self._headline_lengths[self._head]) <= start:
+                break
+            self._drop_oldest()
+        self._arena_cursor = start + length
+        return start
+
+    def _overwrites_live(self, length: int) -> bool:
+        """Whether reserving a headline at the cursor would evict a buffered article."""
+        if not self._count:
+            return False
+        start = self._arena_cursor
+        oldest_offset = int(self._headline_offsets[self._head])
+        if start + length > len(self._arena):
+            if oldest_offset >= start:
+                return True
+            start = 0
+        return oldest_offset < start + length and oldest_offset + int(self._headline_lengths[self._head]) > start
+
+    def view(self) -> Dict[str, np.ndarray]:
+        """
+        Zero-copy views of the buffered articles, oldest first.
+
+        Returns:
+            Dict[str, np.ndarray]: datetime (epoch seconds), score, confidence,
+                label_code and source_id columns
+        """
+        window = slice(self._head, self._head + self._count)
+        return {
+            "datetime": self._timestamps[window],
+            "score": self._scores[window],
+            "confidence": self._confidences[window],
+            "label_code": self._labels[window],
+            "source_id": self._source_ids[window]
+        }
+
+    def headlines(self) -> List[str]:
+        """Decode the buffered headlines, oldest first."""
+        window = slice(self._head, self._head + self._count)
+        arena = memoryview(self._arena)
+        return [
+            bytes(arena[offset:offset + length]).decode("utf-8", errors="ignore")
+            for offset, length in zip(self._headline_offsets[window].tolist(), self._headline_lengths[window].tolist())
+        ]
+
+class RecentArticleStore:
+    """
+    Per-ticker ring buffers of recently ingested articles.
+
+    Args:
+        capacity (int): Articles kept per ticker
+        max_tickers (int): Tickers kept before the least recently used is dropped
+    """
+
+    def __init__(self, capacity: int = settings.RECENT_ARTICLES_CAPACITY,
+                 max_tickers: int = settings.RECENT_ARTICLES_MAX_TICKERS):
+        self.capacity = capacity
+        self.max_tickers = max_tickers
+        self.sources = SourceTable()
+        self._buffers: "OrderedDict[str, ArticleRingBuffer]" = OrderedDict()
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker.upper() in self._buffers
+
+    def append(self, ticker: str, articles: Iterable[Dict[str, Any]]) -> None:
+        """
+        Append analyzed articles for a ticker in publication order.
+
+        Articles older than the newest buffered one (late arrivals from
+        another ticker's feed, for example) are merged into place.
+
+        Args:
+            ticker (str): Stock ticker symbol
+            articles (Iterable[Dict[str, Any]]): Articles as returned by NewsService
+        """
+        ticker = ticker.upper()
+        buffer = self._buffers.get(ticker)
+        if buffer is None:
+            buffer = ArticleRingBuffer(self.capacity, self.sources)
+            self._buffers[ticker] = buffer
+            while len(self._buffers) > self.max_tickers:
+                self._buffers.popitem(last=False)
+        self._buffers.move_to_end(ticker)
+
+        rows = [
+            (article['datetime'], article['sentiment']['score'], article['sentiment']['confidence'],
+             article['sentiment']['label'], article['source'], article['headline'])
+            for article in sorted(articles, key=lambda article: article['datetime'])
+        ]
+        last_timestamp = buffer.last_timestamp
+        if rows and last_timestamp is not None and rows[0][0] < last_timestamp:
+            late = sum(1 for row in rows if row[0] < last_timestamp)
+            dropped = buffer.merge(rows)
+            RECENT_ARTICLES_LATE.inc(max(0, late - dropped), result="merged")
+            RECENT_ARTICLES_LATE.inc(dropped, result="dropped")
+            return
+
+        for row in rows:
+            buffer.append(*row)
+
+    def get(self, ticker: str) -> Optional[ArticleRingBuffer]:
+        return self._buffers.get(ticker.upper())
+
+    def view(self, ticker: str) -> Optional[Dict[str, np.ndarray]]:
+        """Zero-copy column views for a ticker, or None if nothing is buffered."""
+        buffer = self.get(ticker)
+        return None if buffer is None else buffer.view()
+
+# Create a singleton instance
+recent_articles = RecentArticleStore()
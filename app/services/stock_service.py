@@ -1,10 +1,14 @@
+import asyncio
 import finnhub
 from app.config import settings
+from app.services.rate_limiter import finnhub_rate_limiter
+from app.services.metrics import FINNHUB_CALLS
 from typing import Dict, Any
 
 class StockService:
     def __init__(self):
         self.client = finnhub.Client(api_key=settings.FINNHUB_API_KEY)
+        self.client.API_URL = settings.FINNHUB_API_URL
 
     async def get_stock_info(self, ticker: str) -> Dict[str, Any]:
         """
@@ -18,7 +22,14 @@ class StockService:
         """
         try:
             # Get quote data from Finnhub
-            quote = self.client.quote(ticker)
+            await finnhub_rate_limiter.acquire()
+            loop = asyncio.get_running_loop()
+            try:
+                quote = await loop.run_in_executor(None, self.client.quote, ticker)
+            except Exception:
+                FINNHUB_CALLS.inc(endpoint="quote", outcome="error")
+                raise
+            FINNHUB_CALLS.inc(endpoint="quote", outcome="success")
             
             return {
                 "price": quote['c'],  # Current price
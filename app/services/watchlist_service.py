@@ -0,0 +1,202 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.database import SessionLocal
+from app.database.models import Watchlist
+from app.services.metrics import CACHE_REQUESTS
+from app.services.stock_service import stock_service
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+CONFLICT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+class WatchlistService:
+    """
+    Watchlist reads and writes with a per-user read cache.
+
+    Reads are served from an LRU cache keyed by user and every write through
+    this service invalidates that user's entry, so repeat page loads do not
+    touch the database. The cache is per process; WATCHLIST_CACHE_TTL_SECONDS
+    bounds how long a write made by another worker can go unseen.
+
+    Args:
+        max_users (int): Users kept in the cache
+        ttl (float): Seconds a cached watchlist is trusted
+    """
+
+    def __init__(self, max_users: int = settings.WATCHLIST_CACHE_SIZE, ttl: float = settings.WATCHLIST_CACHE_TTL_SECONDS):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._cache: "OrderedDict[int, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        # Sync endpoints run in a thread pool
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a read that raced a write is not cached
+        self._writes = 0
+
+    def get(self, db: Session, user_id: int) -> List[Dict[str, Any]]:
+        """A user's watchlist items, from the cache when possible."""
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._cache[user_id]
+                entry = None
+            if entry is not None:
+                self._cache.move_to_end(user_id)
+            writes = self._writes
+        CACHE_REQUESTS.inc(cache="watchlist", result="miss" if entry is None else "hit")
+        if entry is not None:
+            return entry[1]
+
+        items = [
+            {"symbol": symbol, "name": name, "price": price, "change": change}
+            for symbol, name, price, change in (
+                db.query(Watchlist.symbol, Watchlist.name, Watchlist.price, Watchlist.change)
+                .filter(Watchlist.user_id == user_id)
+                .order_by(Watchlist.id)
+                .all()
+            )
+        ]
+        with self._lock:
+            if writes == self._writes:
+                self._cache[user_id] = (time.monotonic(), items)
+                self._cache.move_to_end(user_id)
+                while len(self._cache) > self.max_users:
+                    self._cache.popitem(last=False)
+        return items
+
+    def symbols(self, db: Session, user_id: int) -> List[str]:
+        return [item["symbol"] for item in self.get(db, user_id)]
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._writes += 1
+            self._cache.pop(user_id, None)
+
+    def add(self, db: Session, user_id: int, items: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Add items to a user's watchlist with a single INSERT ... ON CONFLICT DO NOTHING.
+
+        Dialects without ON CONFLICT insert the new symbols one by one and skip
+        the ones that hit the unique constraint.
+
+        Args:
+            db (Session): Database session
+            user_id (int): Owner of the watchlist
+            items (Iterable[Dict[str, Any]]): Items with symbol, name and optionally price and change
+
+        Returns:
+            List[str]: Symbols that were added; symbols already on the watchlist are skipped
+        """
+        rows = {}
+        for item in items:
+            symbol = item["symbol"].strip().upper()
+            if symbol and symbol not in rows:
+                rows[symbol] = {
+                    "user_id": user_id,
+                    "symbol": symbol,
+                    "name": item.get("name") or symbol,
+                    "price": item.get("price"),
+                    "change": item.get("change"),
+                }
+        if not rows:
+            return []
+
+        conflict_insert = CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+        try:
+            if conflict_insert is None:
+                added = self._insert_new(db, user_id, rows)
+            else:
+                statement = (
+                    conflict_insert(Watchlist)
+                    .values(list(rows.values()))
+                    .on_conflict_do_nothing(index_elements=["user_id", "symbol"])
+                    .returning(Watchlist.symbol)
+                )
+                added = {symbol for (symbol,) in db.execute(statement)}
+            db.commit()
+        finally:
+            self.invalidate(user_id)
+        return [symbol for symbol in rows if symbol in added]
+
+    def _insert_new(self, db: Session, user_id: int, rows: Dict[str, Dict[str, Any]]) -> set:
+        """Insert rows whose symbol is not on the watchlist yet, one savepoint each."""
+        existing = {
+            symbol for (symbol,) in
+            db.query(Watchlist.symbol).filter(Watchlist.user_id == user_id, Watchlist.symbol.in_(list(rows)))
+        }
+        added = set()
+        for symbol, row in rows.items():
+            if symbol in existing:
+                continue
+            try:
+                with db.begin_nested():
+                    db.execute(insert(Watchlist).values(row))
+                added.add(symbol)
+            except IntegrityError:
+                # Added by a concurrent request
+                pass
+        return added
+
+    def remove(self, db: Session, user_id: int, symbols: Iterable[str]) -> List[str]:
+        """Remove symbols from a user's watchlist and return the ones that were there."""
+        symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+        if not symbols:
+            return []
+        statement = (
+            delete(Watchlist)
+            .where(Watchlist.user_id == user_id, Watchlist.symbol.in_(symbols))
+            .returning(Watchlist.symbol)
+        )
+        try:
+            removed = {symbol for (symbol,) in db.execute(statement)}
+            db.commit()
+        finally:
+            self.invalidate(user_id)
+        return [symbol for symbol in symbols if symbol in removed]
+
+    async def refresh_quotes(self, user_id: int, symbols: List[str]) -> None:
+        """
+        Fetch current quotes for watchlist symbols concurrently and store them.
+
+        Meant to run as a background task after a write, so adding a ticker
+        does not wait for Finnhub.
+        """
+        results = await asyncio.gather(
+            *(stock_service.get_stock_info(symbol) for symbol in symbols),
+            return_exceptions=True
+        )
+        quotes = {
+            symbol: result for symbol, result in zip(symbols, results)
+            if not isinstance(result, BaseException)
+        }
+        if not quotes:
+            return
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._store_quotes, user_id, quotes)
+
+    def _store_quotes(self, user_id: int, quotes: Dict[str, Dict[str, Any]]) -> None:
+        with SessionLocal() as db:
+            try:
+                for symbol, quote in quotes.items():
+                    db.query(Watchlist).filter(Watchlist.user_id == user_id, Watchlist.symbol == symbol).update(
+                        {"price": quote["price"], "change": quote["priceChange"]},
+                        synchronize_session=False
+                    )
+                db.commit()
+            finally:
+                self.invalidate(user_id)
+
+# Create a singleton instance
+watchlist_service = WatchlistService()
@@ -0,0 +1,139 @@
+"""Offline stand-ins used by the benchmark suite: synthetic Finnhub data and a tiny model."""
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+COMPANIES = ["Apple", "Microsoft", "Nvidia", "Tesla", "Amazon", "Alphabet", "Meta", "Netflix", "Intel", "AMD"]
+SYMBOLS = {
+    "Apple": "AAPL", "Microsoft": "MSFT", "Nvidia": "NVDA", "Tesla": "TSLA", "Amazon": "AMZN",
+    "Alphabet": "GOOGL", "Meta": "META", "Netflix": "NFLX", "Intel": "INTC", "AMD": "AMD"
+}
+SUBJECTS = ["shares", "stock", "revenue", "earnings", "guidance", "margins", "sales", "outlook"]
+VERBS = ["rise", "fall", "jump", "slide", "surge", "tumble", "beat estimates", "miss estimates", "hold steady"]
+REASONS = [
+    "after quarterly results", "on analyst upgrade", "on analyst downgrade", "amid tariff concerns",
+    "as demand slows", "on strong iPhone sales", "after product launch", "ahead of Fed decision",
+    "following CEO comments", "on buyback news"
+]
+SOURCES = ["Reuters", "Bloomberg", "CNBC", "MarketWatch", "Yahoo", "SeekingAlpha"]
+
+CONSONANTS = "bcdfghjklmnprstvz"
+VOWELS = "aeiou"
+
+def pseudo_word(rng: random.Random, syllables: int = 3) -> str:
+    return "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(syllables))
+
+def synthetic_headline(rng: random.Random, distinct: bool = True) -> str:
+    """
+    A headline built from the fixed vocabulary.
+
+    The vocabulary only has a few thousand combinations, so near-duplicate
+    detection would skip inference for most headlines; unless distinct is
+    False a few random words are appended to keep every headline unique.
+    """
+    headline = f"{rng.choice(COMPANIES)} {rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(REASONS)}"
+    if distinct:
+        headline += " " + " ".join(pseudo_word(rng) for _ in range(3))
+    return headline
+
+class StubFinnhubClient:
+    """
+    Finnhub client stand-in returning deterministic synthetic company news.
+
+    Every call returns fresh URLs so each request exercises the full
+    inference and storage path instead of the stored-sentiment shortcut.
+
+    Args:
+        articles_per_call (int): Number of articles returned by company_news
+        latency (float): Seconds to sleep per call to mimic the network
+        seed (int): Random seed for reproducible headlines
+        distinct (bool): Make every headline unique instead of drawing from the small vocabulary
+    """
+
+    def __init__(self, articles_per_call: int = 50, latency: float = 0.0, seed: int = 7, distinct: bool = True):
+        self.articles_per_call = articles_per_call
+        self.distinct = distinct
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def company_news(self, ticker: str, _from: str = None, to: str = None) -> List[Dict[str, Any]]:
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+        now = int(time.time())
+        return [
+            {
+                "headline": synthetic_headline(self.rng, self.distinct),
+                "url": f"https://news.example.com/{ticker}/{self.calls}/{index}",
+                "datetime": now - self.rng.randint(0, 30 * 24 * 3600),
+                "source": self.rng.choice(SOURCES),
+                "summary": "Synthetic article body used for offline benchmarks.",
+            }
+            for index in range(self.articles_per_call)
+        ]
+
+    def general_news(self, category: str, min_id: int = 0) -> List[Dict[str, Any]]:
+        return [
+            {**article, "category": category}
+            for article in self.company_news(category)
+        ]
+
+    def stock_symbols(self, exchange: str) -> List[Dict[str, str]]:
+        self.calls += 1
+        return [
+            {"symbol": symbol, "description": f"{company.upper()} INC", "type": "Common Stock"}
+            for company, symbol in SYMBOLS.items()
+        ]
+
+    def quote(self, ticker: str) -> Dict[str, float]:
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+        return {"c": round(self.rng.uniform(10, 500), 2), "dp": round(self.rng.uniform(-5, 5), 2)}
+
+def build_tiny_model(path: str, seed: int = 0) -> str:
+    """
+    Save a tiny randomly initialized sequence-classification model and tokenizer.
+
+    The model has the same interface and labels as the production checkpoint,
+    so it exercises tokenization, batching and the forward pass at a fraction
+    of the cost and without network access.
+
+    Args:
+        path (str): Directory to write the model to
+        seed (int): Torch seed for the random weights
+
+    Returns:
+        str: The model directory, usable as SENTIMENT_MODEL_NAME
+    """
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    if os.path.exists(os.path.join(path, "config.json")):
+        return path
+    os.makedirs(path, exist_ok=True)
+
+    words = {word.lower() for phrase in COMPANIES + SUBJECTS + VERBS + REASONS + SOURCES for word in phrase.split()}
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + sorted(words)
+    vocab_file = os.path.join(path, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(vocab) + "\n")
+
+    tokenizer = BertTokenizerFast(vocab_file=vocab_file, model_max_length=128)
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=len(vocab),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=128,
+        num_labels=3,
+        id2label={0: "NEG", 1: "NEU", 2: "POS"},
+        label2id={"NEG": 0, "NEU": 1, "POS": 2},
+    )
+    BertForSequenceClassification(config).save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
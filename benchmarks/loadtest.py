@@ -0,0 +1,331 @@
+"""
+Load test of the HTTP API against a local Finnhub stand-in.
+
+Starts a mock Finnhub server with configurable latency and 429 errors, runs
+the FastAPI app under Uvicorn in a subprocess against a throwaway SQLite
+database and the tiny model, then drives a weighted mix of news, stock-info,
+trends and watchlist requests at increasing concurrency. Throughput, error
+rate and p50/p95/p99 latency per route and per concurrency level are written
+to a JSON file. Nothing leaves the machine.
+
+Usage:
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --concurrency 1 4 16 64 --duration 30 --latency 0.2 --error-rate 0.05
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import requests
+
+from benchmarks.fixtures import SYMBOLS
+from benchmarks.mock_finnhub import MockFinnhubServer
+from benchmarks.run_benchmarks import RESULTS_DIR, configure_environment
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Route name to relative weight in the default traffic mix
+DEFAULT_MIX = {"news": 4, "stock_info": 3, "trends": 2, "watchlist": 1}
+WATCHLIST_SIZE = 3
+
+class Sample(NamedTuple):
+    route: str
+    status: int
+    seconds: float
+
+class Scenario:
+    """
+    Builds requests for the traffic mix.
+
+    Args:
+        base_url (str): URL of the running app
+        tickers (Sequence[str]): Ticker symbols to request
+        user_ids (Sequence[int]): Users with a populated watchlist
+        mix (Dict[str, int]): Route name to relative weight
+    """
+
+    def __init__(self, base_url: str, tickers: Sequence[str], user_ids: Sequence[int], mix: Dict[str, int]):
+        self.base_url = base_url
+        self.tickers = list(tickers)
+        self.user_ids = list(user_ids)
+        self.routes = [route for route, weight in mix.items() if weight > 0]
+        self.weights = [mix[route] for route in self.routes]
+
+    def url(self, route: str, rng: random.Random, ticker: Optional[str] = None) -> str:
+        ticker = ticker or rng.choice(self.tickers)
+        if route == "news":
+            return f"{self.base_url}/api/news/{ticker}"
+        if route == "stock_info":
+            return f"{self.base_url}/api/stock-info/{ticker}"
+        if route == "trends":
+            return f"{self.base_url}/api/analysis/trends/{ticker}"
+        if route == "watchlist":
+            return f"{self.base_url}/api/watchlist/?user_id={rng.choice(self.user_ids)}"
+        raise ValueError(f"Unknown route '{route}'")
+
+    def choose(self, rng: random.Random) -> str:
+        return rng.choices(self.routes, weights=self.weights)[0]
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+def summarize_samples(samples: List[Sample], seconds: float) -> Dict[str, Any]:
+    timings = sorted(sample.seconds for sample in samples)
+    errors = sum(1 for sample in samples if not 200 <= sample.status < 400)
+    status_codes: Dict[str, int] = defaultdict(int)
+    for sample in samples:
+        # 0 means the request never got a response (connection error or timeout)
+        status_codes[str(sample.status)] += 1
+    summary = {
+        "requests": len(samples),
+        "throughput_rps": len(samples) / seconds if seconds else 0.0,
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "status_codes": dict(status_codes),
+    }
+    if timings:
+        summary.update({
+            "p50_ms": percentile(timings, 0.50) * 1000,
+            "p95_ms": percentile(timings, 0.95) * 1000,
+            "p99_ms": percentile(timings, 0.99) * 1000,
+            "max_ms": timings[-1] * 1000,
+        })
+    return summary
+
+def run_stage(scenario: Scenario, concurrency: int, duration: float, timeout: float, seed: int) -> Dict[str, Any]:
+    """
+    Keep concurrency requests in flight for duration seconds.
+
+    Every client sends its next request as soon as the previous one finishes,
+    so throughput stops growing once the server saturates and latency rises.
+    """
+    samples: List[Sample] = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        local = []
+        with requests.Session() as session:
+            while time.monotonic() < deadline:
+                route = scenario.choose(rng)
+                start = time.perf_counter()
+                try:
+                    status = session.get(scenario.url(route, rng), timeout=timeout).status_code
+                except requests.RequestException:
+                    status = 0
+                local.append(Sample(route, status, time.perf_counter() - start))
+        with lock:
+            samples.extend(local)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    elapsed = time.monotonic() - start
+
+    by_route: Dict[str, List[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_route[sample.route].append(sample)
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        **summarize_samples(samples, elapsed),
+        "routes": {route: summarize_samples(route_samples, elapsed) for route, route_samples in sorted(by_route.items())},
+    }
+
+def find_saturation(stages: List[Dict[str, Any]], min_gain: float) -> Optional[int]:
+    """First concurrency level whose throughput gained less than min_gain over the best so far."""
+    best = 0.0
+    for stage in stages:
+        if best and stage["throughput_rps"] < best * (1 + min_gain):
+            return stage["concurrency"]
+        best = max(best, stage["throughput_rps"])
+    return None
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_app(port: int, workers: int, log_path: str, timeout: float) -> subprocess.Popen:
+    """Start Uvicorn with the current environment and wait until it answers."""
+    log = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT_DIR, env=os.environ.copy(), stdout=log, stderr=subprocess.STDOUT
+    )
+    log.close()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            with open(log_path) as f:
+                raise RuntimeError(f"Uvicorn exited with code {process.returncode}:\n{f.read()[-2000:]}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/metrics", timeout=1).ok:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Uvicorn did not start within {timeout} seconds, see {log_path}")
+
+def stop_app(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def seed_users(base_url: str, tickers: Sequence[str], users: int, seed: int) -> List[int]:
+    """Register users and give each a small watchlist."""
+    rng = random.Random(seed)
+    user_ids = []
+    with requests.Session() as session:
+        for index in range(users):
+            response = session.post(f"{base_url}/api/users/register", json={
+                "username": f"loadtest{index}",
+                "email": f"loadtest{index}@example.com",
+                "password": "loadtest"
+            })
+            response.raise_for_status()
+            user_id = response.json()["data"]["id"]
+            for symbol in rng.sample(list(tickers), min(WATCHLIST_SIZE, len(tickers))):
+                session.post(f"{base_url}/api/watchlist/", json={
+                    "symbol": symbol, "name": symbol, "user_id": user_id
+                }).raise_for_status()
+            user_ids.append(user_id)
+    return user_ids
+
+def warm_up(scenario: Scenario, timeout: float) -> None:
+    """Request every route once per ticker so model loading and first fetches are not measured."""
+    rng = random.Random(0)
+    with requests.Session() as session:
+        for ticker in scenario.tickers:
+            for route in scenario.routes:
+                try:
+                    session.get(scenario.url(route, rng, ticker), timeout=timeout)
+                except requests.RequestException:
+                    pass
+
+def parse_mix(values: List[str]) -> Dict[str, int]:
+    mix = dict(DEFAULT_MIX)
+    for value in values:
+        route, _, weight = value.partition("=")
+        if route not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"Expected ROUTE=WEIGHT with ROUTE in {', '.join(DEFAULT_MIX)}, got '{value}'")
+        mix[route] = int(weight)
+    return mix
+
+def print_stage(stage: Dict[str, Any]) -> None:
+    print(f"\nconcurrency {stage['concurrency']}: {stage['throughput_rps']:.1f} req/s, "
+          f"{stage['error_rate']:.1%} errors, p50 {stage.get('p50_ms', 0):.0f} ms, "
+          f"p95 {stage.get('p95_ms', 0):.0f} ms, p99 {stage.get('p99_ms', 0):.0f} ms")
+    for route, summary in stage["routes"].items():
+        print(f"  {route:<12} {summary['throughput_rps']:>8.1f} req/s {summary['error_rate']:>7.1%} errors "
+              f"p50 {summary.get('p50_ms', 0):>7.0f} ms p95 {summary.get('p95_ms', 0):>7.0f} ms "
+              f"p99 {summary.get('p99_ms', 0):>7.0f} ms")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the API against a local Finnhub stand-in")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32],
+                        help="Concurrent clients per stage")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per stage")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--mix", nargs="*", default=[], metavar="ROUTE=WEIGHT",
+                        help=f"Traffic weights (default: {' '.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())})")
+    parser.add_argument("--tickers", type=int, default=len(SYMBOLS), help="Distinct tickers to request")
+    parser.add_argument("--users", type=int, default=10, help="Users with a watchlist")
+    parser.add_argument("--workers", type=int, default=1, help="Uvicorn worker processes")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock Finnhub latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random mock latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of Finnhub calls answered with 429")
+    parser.add_argument("--quota", type=int, help="Mock Finnhub calls per minute before answering 429")
+    parser.add_argument("--articles", type=int, default=20, help="Articles per mock news response")
+    parser.add_argument("--cache-ttl", type=int, default=300, help="NEWS_CACHE_TTL_SECONDS for the app")
+    parser.add_argument("--app-calls-per-minute", type=int, default=1000000,
+                        help="FINNHUB_CALLS_PER_MINUTE for the app's own rate limiter")
+    parser.add_argument("--min-gain", type=float, default=0.1,
+                        help="Throughput gain below which a stage counts as saturated")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Result file (defaults to benchmarks/results/loadtest_<timestamp>.json)")
+    parser.add_argument("--work-dir", help="Directory for the SQLite database, tiny model and server log")
+    return parser.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    mix = parse_mix(args.mix)
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="news-loadtest-")
+    tickers = list(SYMBOLS.values())[:args.tickers] + [f"T{index:04d}" for index in range(args.tickers - len(SYMBOLS))]
+
+    mock = MockFinnhubServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        calls_per_minute=args.quota,
+        articles_per_call=args.articles,
+        seed=args.seed
+    ).start()
+    configure_environment(work_dir)
+    os.environ["FINNHUB_API_URL"] = mock.url
+    os.environ["FINNHUB_CALLS_PER_MINUTE"] = str(args.app_calls_per_minute)
+    os.environ["NEWS_CACHE_TTL_SECONDS"] = str(args.cache_ttl)
+
+    from app.database.database import engine
+    from app.database.models import Base
+    Base.metadata.create_all(bind=engine)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    log_path = os.path.join(work_dir, "server.log")
+    print(f"Starting {args.workers} Uvicorn worker(s) on {base_url} (log: {log_path})")
+    process = start_app(port, args.workers, log_path, timeout=120)
+    results = {
+        "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "parameters": {**vars(args), "mix": mix, "tickers": tickers},
+        "stages": [],
+    }
+    try:
+        scenario = Scenario(base_url, tickers, seed_users(base_url, tickers, args.users, args.seed), mix)
+        print("Warming up...")
+        warm_up(scenario, args.timeout)
+        for concurrency in args.concurrency:
+            before = mock.stats()
+            stage = run_stage(scenario, concurrency, args.duration, args.timeout, args.seed + concurrency)
+            after = mock.stats()
+            stage["finnhub"] = {
+                key: {endpoint: count - before[key].get(endpoint, 0) for endpoint, count in after[key].items()}
+                for key in after
+            }
+            results["stages"].append(stage)
+            print_stage(stage)
+    finally:
+        stop_app(process)
+        mock.stop()
+
+    peak = max(results["stages"], key=lambda stage: stage["throughput_rps"], default=None)
+    results["peak"] = {"concurrency": peak["concurrency"], "throughput_rps": peak["throughput_rps"]} if peak else None
+    results["saturation_concurrency"] = find_saturation(results["stages"], args.min_gain)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest_{results['timestamp']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    if peak:
+        print(f"\nPeak throughput {peak['throughput_rps']:.1f} req/s at concurrency {peak['concurrency']}; "
+              f"saturated at {results['saturation_concurrency'] or 'none of the tested levels'}")
+    print(f"Results saved to {output}")
+
+if __name__ == "__main__":
+    main()
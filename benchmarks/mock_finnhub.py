@@ -0,0 +1,137 @@
+"""Local HTTP stand-in for the Finnhub REST API, used by the load test."""
+import json
+import random
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.fixtures import StubFinnhubClient
+
+API_PREFIX = "/api/v1"
+
+class MockFinnhubServer:
+    """
+    Threaded HTTP server answering the Finnhub endpoints the app uses.
+
+    Responses come from StubFinnhubClient. Every request sleeps for the
+    configured latency, a random fraction fails with 429, and requests above
+    the per-minute quota fail with 429 the way the real API does.
+
+    Args:
+        port (int): Port to listen on (0 picks a free one)
+        latency (float): Seconds to sleep per request
+        jitter (float): Extra random latency, up to this many seconds
+        error_rate (float): Fraction of requests answered with 429
+        calls_per_minute (Optional[int]): Quota over a sliding minute (None for unlimited)
+        articles_per_call (int): Articles returned by the news endpoints
+        seed (int): Random seed for the data and the injected errors
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        calls_per_minute: Optional[int] = None,
+        articles_per_call: int = 20,
+        seed: int = 7
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls_per_minute = calls_per_minute
+        self.stub = StubFinnhubClient(articles_per_call=articles_per_call, seed=seed)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.rate_limited: Dict[str, int] = defaultdict(int)
+        self._recent_calls: deque = deque()
+
+        handler = type("Handler", (_Handler,), {"mock": self})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> "MockFinnhubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-finnhub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"calls": dict(self.calls), "rate_limited": dict(self.rate_limited)}
+
+    def admit(self, endpoint: str) -> bool:
+        """Count a request and decide whether it is answered or rate limited."""
+        now = time.monotonic()
+        with self.lock:
+            self.calls[endpoint] += 1
+            while self._recent_calls and self._recent_calls[0] <= now - 60:
+                self._recent_calls.popleft()
+            over_quota = self.calls_per_minute is not None and len(self._recent_calls) >= self.calls_per_minute
+            if over_quota or self.rng.random() < self.error_rate:
+                self.rate_limited[endpoint] += 1
+                return False
+            self._recent_calls.append(now)
+            return True
+
+    def respond(self, endpoint: str, params: Dict[str, str]) -> Any:
+        with self.lock:
+            if endpoint == "company-news":
+                return self.stub.company_news(params.get("symbol", "UNKNOWN"))
+            if endpoint == "news":
+                return self.stub.general_news(params.get("category", "general"))
+            if endpoint == "quote":
+                return {**self.stub.quote(params.get("symbol", "UNKNOWN")), "t": int(time.time())}
+            if endpoint == "stock/symbol":
+                return self.stub.stock_symbols(params.get("exchange", "US"))
+        return None
+
+class _Handler(BaseHTTPRequestHandler):
+    mock: MockFinnhubServer
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        # The finnhub client joins API_URL and paths with a double slash
+        path = re.sub(r"/+", "/", parts.path)
+        endpoint = path[len(API_PREFIX):].strip("/") if path.startswith(API_PREFIX) else path.strip("/")
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+
+        mock = self.mock
+        delay = mock.latency + (mock.rng.uniform(0, mock.jitter) if mock.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        if not mock.admit(endpoint):
+            self._send(429, {"error": "API limit reached. Please try again later."})
+            return
+        body = mock.respond(endpoint, params)
+        if body is None:
+            self._send(404, {"error": f"Unknown endpoint '{endpoint}'"})
+            return
+        self._send(200, body)
+
+    def _send(self, status: int, body: Any) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Keep the load test output readable
+        pass
@@ -0,0 +1,226 @@
+"""
+Offline benchmark suite for the ingestion, inference and analysis hot paths.
+
+Runs against a stub Finnhub client, a tiny randomly initialized model and a
+throwaway SQLite database, then writes the results to a JSON file so runs can
+be compared for regressions.
+
+Usage:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/bench_20250512_200200.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from benchmarks.fixtures import StubFinnhubClient, build_tiny_model, synthetic_headline, SOURCES
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+def configure_environment(work_dir: str) -> None:
+    """Point the app at SQLite and the tiny model before any app module is imported."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    os.environ["SENTIMENT_MODEL_NAME"] = build_tiny_model(os.path.join(work_dir, "tiny-model"))
+    os.environ["FINNHUB_API_KEY"] = "benchmark"
+    os.environ["FINNHUB_CALLS_PER_MINUTE"] = "1000000"
+    os.environ["NEWS_CACHE_TTL_SECONDS"] = "0"
+    os.environ["TICKER_DICTIONARY_PATH"] = os.path.join(work_dir, "ticker_dictionary.json")
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        "runs": len(ordered),
+        "mean_seconds": statistics.fmean(ordered),
+        "median_seconds": statistics.median(ordered),
+        "p95_seconds": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "min_seconds": ordered[0],
+    }
+
+def measure(func: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+def bench_get_news(repeat: int, articles_per_call: int, distinct: bool = True) -> Dict[str, Any]:
+    """End-to-end NewsService.get_news on fresh tickers: fetch, inference, store."""
+    from app.services.news_service import news_service
+
+    news_service.client = StubFinnhubClient(articles_per_call=articles_per_call, distinct=distinct)
+    counter = iter(range(10 ** 9))
+    # Near-duplicates reuse a canonical sentiment and skip inference
+    linked = []
+
+    def run() -> None:
+        articles = asyncio.run(news_service.get_news(f"T{next(counter):05d}"))
+        linked.append(sum(1 for article in articles if article['duplicate_of']))
+
+    result = measure(run, repeat)
+    result["articles_per_call"] = articles_per_call
+    result["articles_per_second"] = articles_per_call / result["mean_seconds"]
+    result["dedup_hit_rate"] = sum(linked[-repeat:]) / (articles_per_call * repeat)
+    return result
+
+def bench_analyze_batch(repeat: int, batch_sizes: List[int], num_texts: int) -> Dict[str, Any]:
+    """SentimentAnalyzer.analyze_batch throughput for each batch size."""
+    from app.ml.sentiment_analyzer import sentiment_analyzer
+
+    rng = random.Random(1)
+    texts = [synthetic_headline(rng) for _ in range(num_texts)]
+    results = {}
+    for batch_size in batch_sizes:
+        result = measure(lambda: sentiment_analyzer.analyze_batch(texts, batch_size=batch_size), repeat)
+        result["texts"] = num_texts
+        result["texts_per_second"] = num_texts / result["mean_seconds"]
+        results[str(batch_size)] = result
+    return results
+
+def bench_store_news(repeat: int, num_articles: int) -> Dict[str, Any]:
+    """NewsService._store_news write rate for previously unseen articles."""
+    from app.database.database import SessionLocal
+    from app.services.news_service import news_service
+
+    rng = random.Random(2)
+    counter = iter(range(10 ** 9))
+    now = int(time.time())
+
+    def run() -> None:
+        batch = next(counter)
+        articles = [
+            {
+                "headline": synthetic_headline(rng),
+                "url": f"https://store.example.com/{batch}/{index}",
+                "datetime": now - index,
+                "source": rng.choice(SOURCES),
+                "content": "",
+                "sentiment": {"label": "positive", "score": 0.9, "confidence": 0.9},
+                "duplicate_of": None,
+            }
+            for index in range(num_articles)
+        ]
+        with SessionLocal() as db:
+            news_service._store_news(db, articles, "BENCH")
+
+    result = measure(run, repeat)
+    result["articles"] = num_articles
+    result["articles_per_second"] = num_articles / result["mean_seconds"]
+    return result
+
+def bench_trend_analyzer(repeat: int, sizes: List[int]) -> Dict[str, Any]:
+    """TrendAnalyzer.analyze_sentiment_trends latency as the input grows."""
+    from app.ml.trend_analyzer import trend_analyzer
+
+    rng = random.Random(3)
+    now = int(time.time())
+    results = {}
+    for size in sizes:
+        data = [
+            {
+                "score": rng.random(),
+                "label": rng.choice(["positive", "negative", "neutral"]),
+                "datetime": now - rng.randint(0, 90 * 24 * 3600),
+            }
+            for _ in range(size)
+        ]
+        result = measure(lambda: trend_analyzer.analyze_sentiment_trends(data), repeat)
+        result["items"] = size
+        results[str(size)] = result
+    return results
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Print the relative change of every mean latency and throughput against a baseline."""
+    now, before = flatten(current["benchmarks"]), flatten(baseline["benchmarks"])
+    print(f"\nComparison against baseline from {baseline.get('timestamp', 'unknown')}:")
+    for name in sorted(now):
+        if name not in before or not before[name]:
+            continue
+        if not (name.endswith("mean_seconds") or name.endswith("per_second")):
+            continue
+        change = (now[name] - before[name]) / before[name] * 100
+        # Lower latency and higher throughput are improvements
+        better = change < 0 if name.endswith("mean_seconds") else change > 0
+        marker = "improved" if better else "regressed"
+        print(f"  {name:<55} {before[name]:>12.6g} -> {now[name]:>12.6g} ({change:+.1f}%, {marker})")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--articles", type=int, default=50, help="Articles per stub Finnhub call")
+    parser.add_argument("--texts", type=int, default=256, help="Texts per analyze_batch run")
+    parser.add_argument("--vocabulary-headlines", action="store_true",
+                        help="Draw get_news headlines from the small fixed vocabulary, so many are near-duplicates")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--trend-sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--output", help="Result file (defaults to benchmarks/results/bench_<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    parser.add_argument("--work-dir", help="Directory for the SQLite database and tiny model")
+    return parser.parse_args()
+
+def main() -> None:
+    args = parse_args()
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="news-bench-")
+    configure_environment(work_dir)
+
+    from app.database.database import engine
+    from app.database.models import Base
+    Base.metadata.create_all(bind=engine)
+
+    import torch
+    results = {
+        "timestamp": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "torch": torch.__version__,
+            "threads": torch.get_num_threads(),
+        },
+        "parameters": vars(args),
+        "benchmarks": {},
+    }
+
+    print("Benchmarking NewsService.get_news...")
+    results["benchmarks"]["get_news"] = bench_get_news(args.repeat, args.articles, not args.vocabulary_headlines)
+    print(f"  near-duplicate hit rate: {results['benchmarks']['get_news']['dedup_hit_rate']:.1%}")
+    print("Benchmarking SentimentAnalyzer.analyze_batch...")
+    results["benchmarks"]["analyze_batch"] = bench_analyze_batch(args.repeat, args.batch_sizes, args.texts)
+    print("Benchmarking NewsService._store_news...")
+    results["benchmarks"]["store_news"] = bench_store_news(args.repeat, args.articles)
+    print("Benchmarking TrendAnalyzer...")
+    results["benchmarks"]["trend_analyzer"] = bench_trend_analyzer(args.repeat, args.trend_sizes)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{results['timestamp']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results["benchmarks"], indent=2))
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
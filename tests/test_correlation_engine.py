@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from app.ml.correlation_engine import SentimentPriceCorrelator
+
+@pytest.fixture
+def candles():
+    times = np.arange(10, dtype=np.int64) * 3600 + 1_700_000_000
+    close = np.linspace(100.0, 110.0, len(times))
+    return {"t": times, "close": close}
+
+@pytest.mark.parametrize("timestamps, scores", [
+    (np.array([], dtype=np.int64), np.array([], dtype=np.float64)),
+    # Every article predates the first candle
+    (np.array([1_600_000_000, 1_600_000_600]), np.array([0.5, -0.5])),
+])
+def test_no_articles_on_the_candle_grid(candles, timestamps, scores):
+    result = SentimentPriceCorrelator().correlate(timestamps, scores, candles, max_lag=3, window=4)
+    assert result["articles"] == 0
+    assert result["covered_buckets"] == 0
+    assert result["best_lag"] is None
+    assert all(point["sentiment"] == 0.0 for point in result["momentum"]["series"])
+
+def test_articles_are_averaged_per_candle(candles):
+    timestamps = candles["t"][[2, 2, 5]] + 60
+    scores = np.array([1.0, 0.0, -1.0])
+    sentiment, counts = SentimentPriceCorrelator()._bucket_sentiment(timestamps, scores, candles["t"])
+    assert counts.tolist() == [0, 0, 2, 0, 0, 1, 0, 0, 0, 0]
+    assert sentiment[2] == pytest.approx(0.5)
+    assert sentiment[5] == pytest.approx(-1.0)
@@ -0,0 +1,29 @@
+import pytest
+
+from app.ml.near_duplicate import NearDuplicateDetector
+
+@pytest.fixture
+def detector():
+    detector = NearDuplicateDetector()
+    detector.add("http://a/1", "Apple shares rise after quarterly results", "positive")
+    return detector
+
+@pytest.mark.parametrize("headline", [
+    "Apple shares rise after quarterly results",
+    "APPLE SHARES RISE AFTER QUARTERLY RESULTS!",
+    "Apple shares rise, after quarterly results",
+])
+def test_reworded_copies_match(detector, headline):
+    assert detector.find(headline) == ("http://a/1", "positive")
+
+@pytest.mark.parametrize("headline", [
+    "Apple shares fall after quarterly results",
+    "Apple shares do not rise after quarterly results",
+])
+def test_opposite_polarity_does_not_match(detector, headline):
+    assert detector.find(headline) is None
+
+def test_headlines_without_text_are_never_matched(detector):
+    detector.add("http://a/2", "???")
+    assert detector.find("!!!") is None
+    assert "http://a/2" in detector
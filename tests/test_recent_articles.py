@@ -0,0 +1,26 @@
+import pytest
+
+from app.services.recent_articles import ArticleRingBuffer, SourceTable
+
+@pytest.fixture
+def buffer():
+    return ArticleRingBuffer(capacity=256, sources=SourceTable(), initial_size=16)
+
+@pytest.mark.parametrize("headline_length", [10, 90, 97, 130, 600])
+def test_buffer_fills_to_capacity_with_long_headlines(buffer, headline_length):
+    headlines = [f"{index:05d}".ljust(headline_length, "x") for index in range(1000)]
+    for index, headline in enumerate(headlines):
+        buffer.append(index, 0.5, 0.9, "positive", "Reuters", headline)
+        assert len(buffer) == min(index + 1, buffer.capacity)
+
+    assert buffer.view()["datetime"].tolist() == list(range(1000 - buffer.capacity, 1000))
+    assert buffer.headlines() == [headline[:512] for headline in headlines[-buffer.capacity:]]
+
+def test_merge_keeps_articles_ordered(buffer):
+    for timestamp in (10, 30, 50):
+        buffer.append(timestamp, 0.0, 0.9, "neutral", "CNBC", f"h{timestamp}")
+    dropped = buffer.merge([(20, 1.0, 0.9, "positive", "Reuters", "h20"), (40, -1.0, 0.9, "negative", "Reuters", "h40")])
+
+    assert dropped == 0
+    assert buffer.view()["datetime"].tolist() == [10, 20, 30, 40, 50]
+    assert buffer.headlines() == ["h10", "h20", "h30", "h40", "h50"]
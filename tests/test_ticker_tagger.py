@@ -0,0 +1,40 @@
+import pytest
+
+from app.ml.ticker_tagger import TickerTagger
+
+COMPANIES = {
+    "AAPL": ["apple"],
+    "C": ["citigroup"],
+    "F": ["ford motor"],
+    "S": ["sentinelone"],
+    "U": ["unity software"],
+    "X": ["united states steel"],
+}
+
+@pytest.fixture
+def tagger():
+    return TickerTagger(COMPANIES)
+
+@pytest.mark.parametrize("headline", [
+    "U.S. stocks fall as S&P 500 slides",
+    "Startup raises Series C round",
+    "Elon Musk's X sees advertisers return",
+    "Ford recalls F-150 pickups",
+])
+def test_short_symbols_need_a_qualifier(tagger, headline):
+    assert tagger.tag(headline) == []
+
+@pytest.mark.parametrize("headline, expected", [
+    ("$F shares jump after earnings", ["F"]),
+    ("Ford Motor (NYSE: F) recalls F-150 pickups", ["F"]),
+    ("Citigroup and $C rally", ["C"]),
+    ("Analysts upgrade NASDAQ:U on game engine demand", ["U"]),
+])
+def test_qualified_short_symbols(tagger, headline, expected):
+    assert tagger.tag(headline) == expected
+
+def test_longer_symbols_and_names(tagger):
+    assert tagger.tag("AAPL and Apple suppliers rise") == ["AAPL"]
+    assert tagger.tag("United States Steel and Unity Software gain") == ["X", "U"]
+    # Upper case says nothing about a symbol in an all-caps headline
+    assert tagger.tag("AAPL SHARES RISE") == []